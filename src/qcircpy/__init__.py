@@ -1,3 +1,18 @@
 from . import engine as engine
 from . import quantum as quantum
-from . import gates as gates
\ No newline at end of file
+from . import gates as gates
+from . import ir as ir
+from . import optimiser as optimiser
+from . import executor as executor
+from . import batch as batch
+from . import qasm as qasm
+from . import tensornet as tensornet
+from . import trajectories as trajectories
+from . import cache as cache
+from . import planner as planner
+from . import circuits as circuits
+from . import backends as backends
+from . import generators as generators
+from . import scheduler as scheduler
+from . import sparse as sparse
+from . import binary as binary
\ No newline at end of file
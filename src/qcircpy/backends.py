@@ -0,0 +1,204 @@
+import warnings
+
+import numpy as np
+
+from . import exceptions
+from . import gates
+from . import kernels
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+JIT = numba is not None
+
+prange = numba.prange if JIT else range
+
+def _single(vector: np.ndarray, gate: np.ndarray, position: int) -> None:
+    stride = 1 << position
+    u00, u01, u10, u11 = gate[0, 0], gate[0, 1], gate[1, 0], gate[1, 1]
+    for pair in prange(vector.size >> 1):
+        low = pair & (stride - 1)
+        i = ((pair ^ low) << 1) | low
+        j = i | stride
+        a = vector[i]
+        b = vector[j]
+        vector[i] = u00 * a + u01 * b
+        vector[j] = u10 * a + u11 * b
+
+def _controlled(vector: np.ndarray, gate: np.ndarray, mask: int, pattern: int, position: int) -> None:
+    stride = 1 << position
+    u00, u01, u10, u11 = gate[0, 0], gate[0, 1], gate[1, 0], gate[1, 1]
+    for pair in prange(vector.size >> 1):
+        low = pair & (stride - 1)
+        i = ((pair ^ low) << 1) | low
+        if i & mask == pattern:
+            j = i | stride
+            a = vector[i]
+            b = vector[j]
+            vector[i] = u00 * a + u01 * b
+            vector[j] = u10 * a + u11 * b
+
+def _diagonal(vector: np.ndarray, diagonal: np.ndarray, positions: np.ndarray) -> None:
+    for index in prange(vector.size):
+        entry = 0
+        for position in positions:
+            entry = (entry << 1) | ((index >> position) & 1)
+        vector[index] *= diagonal[entry]
+
+if JIT:
+    _single = numba.njit(parallel=True, cache=True)(_single)
+    _controlled = numba.njit(parallel=True, cache=True)(_controlled)
+    _diagonal = numba.njit(parallel=True, cache=True)(_diagonal)
+
+
+class Backend:
+    """
+    The NumPy state-vector backend, and the interface every backend implements.
+
+    Each operation takes a state of shape (2^n,) or (2^n, m), qubit 0 being the
+    most significant, and returns the resulting state. Backends with `inplace`
+    set may overwrite and return the input buffer instead of allocating a new
+    one, and `controlled` always does, so callers sharing a buffer must copy it
+    first.
+
+    Attributes:
+        name (str): The device name the backend is registered under.
+        module (module): The array module states live in.
+        gates (dict[str, np.ndarray]): The fixed gate matrices by name, as arrays of `module`.
+        inplace (bool): Whether `apply` and `diagonal` may modify their input.
+    """
+
+    name = "cpu"
+
+    def __init__(self) -> None:
+        self.module = np
+        self.gates = gates.GATES["cpu"]
+        self.inplace = False
+
+    def apply(self, state: np.ndarray, gate: np.ndarray, qubits: tuple[int, ...]) -> np.ndarray:
+        return kernels.apply(state, gate, qubits)
+
+    def controlled(self, state: np.ndarray, gate: np.ndarray, controls: tuple[int, ...], targets: tuple[int, ...], states: tuple[int, ...] | None = None) -> np.ndarray:
+        """
+        Apply `gate` to `targets` on the subspace where each control qubit equals
+        its entry of `states` (all 1 by default).
+
+        Unlike the other operations this always updates `state` in place, whatever
+        `inplace` says: the 2^(n-k) amplitudes of the control subspace are gathered
+        from a strided view into one temporary, transformed and written back, and
+        no other amplitude is touched.
+        """
+        size = state.shape[0].bit_length() - 1
+        tensor = state.reshape((2,) * size + state.shape[1:])
+        index = [slice(None)] * size
+        for control, value in zip(controls, (1,) * len(controls) if states is None else states):
+            index[control] = value
+        index = tuple(index)
+        remaining = [qubit for qubit in range(size) if qubit not in controls]
+        view = tensor[index]
+        block = np.ascontiguousarray(view).reshape((2 ** len(remaining),) + state.shape[1:])
+        view[...] = kernels.apply(block, gate, [remaining.index(target) for target in targets]).reshape(view.shape)
+        return state
+
+    def diagonal(self, state: np.ndarray, diagonal: np.ndarray, qubits: tuple[int, ...]) -> np.ndarray:
+        """
+        Multiply each amplitude by the entry of `diagonal` selected by the bits of `qubits`.
+        """
+        size = state.shape[0].bit_length() - 1
+        order = sorted(qubits)
+        factor = np.asarray(diagonal).reshape((2,) * len(qubits)).transpose([list(qubits).index(qubit) for qubit in order])
+        shape = [1] * size
+        for qubit in order:
+            shape[qubit] = 2
+        tensor = state.reshape((2,) * size + (-1,))
+        return (tensor * factor.reshape(shape + [1])).reshape(state.shape)
+
+
+class JitBackend(Backend):
+    """
+    A CPU backend running fused Numba loops directly on the state buffer.
+
+    Single-qubit, singly-targeted controlled and diagonal gates each run as one
+    parallel loop over amplitude pairs with no temporary arrays. Other gates,
+    and batches of more than one column, use the NumPy kernels. Without Numba
+    installed the backend warns once and behaves exactly like "cpu".
+    """
+
+    name = "cpu-jit"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.inplace = JIT
+        if not JIT:
+            warnings.warn("Numba is not installed; device cpu-jit falls back to the NumPy kernels.", RuntimeWarning, stacklevel=3)
+
+    def __vector(self, state: np.ndarray) -> np.ndarray | None:
+        if not JIT or state.dtype != complex or not state.flags.c_contiguous or state.size != state.shape[0]:
+            return None
+        return state.reshape(-1)
+
+    def apply(self, state: np.ndarray, gate: np.ndarray, qubits: tuple[int, ...]) -> np.ndarray:
+        vector = self.__vector(state)
+        if vector is None:
+            return super().apply(state, gate, qubits)
+        qubits = tuple(qubits)
+        gate = np.asarray(gate, dtype=complex)
+        if np.count_nonzero(gate - np.diag(np.diagonal(gate))) == 0:
+            return self.diagonal(state, np.diagonal(gate), qubits)
+        if len(qubits) == 1:
+            _single(vector, gate, state.shape[0].bit_length() - 2 - qubits[0])
+            return state
+        # A leading block of identity followed by a 2x2 block is a gate on the last
+        # qubit controlled by all the others, as for CNOT, CY and TOFFOLI.
+        size = len(gate)
+        if np.array_equal(gate[:size - 2, :size - 2], np.identity(size - 2)) and not gate[:size - 2, size - 2:].any() and not gate[size - 2:, :size - 2].any():
+            return self.controlled(state, gate[size - 2:, size - 2:], qubits[:-1], qubits[-1:])
+        return super().apply(state, gate, qubits)
+
+    def controlled(self, state: np.ndarray, gate: np.ndarray, controls: tuple[int, ...], targets: tuple[int, ...], states: tuple[int, ...] | None = None) -> np.ndarray:
+        vector = self.__vector(state)
+        if vector is None or len(targets) != 1:
+            return super().controlled(state, gate, controls, targets, states)
+        top = state.shape[0].bit_length() - 2
+        mask = 0
+        pattern = 0
+        for control, value in zip(controls, (1,) * len(controls) if states is None else states):
+            mask |= 1 << (top - control)
+            pattern |= value << (top - control)
+        _controlled(vector, np.asarray(gate, dtype=complex), mask, pattern, top - targets[0])
+        return state
+
+    def diagonal(self, state: np.ndarray, diagonal: np.ndarray, qubits: tuple[int, ...]) -> np.ndarray:
+        vector = self.__vector(state)
+        if vector is None:
+            return super().diagonal(state, diagonal, qubits)
+        top = state.shape[0].bit_length() - 2
+        positions = np.array([top - qubit for qubit in qubits], dtype=np.int64)
+        _diagonal(vector, np.asarray(diagonal, dtype=complex), positions)
+        return state
+
+
+BACKENDS = {}
+
+_INSTANCES = {}
+
+def register(name: str, factory: type[Backend]) -> None:
+    """
+    Make a backend available under a device name. The factory is called once,
+    the first time the device is requested, and gate matrices for the device
+    are taken from the instance's `gates` table.
+    """
+    BACKENDS[name] = factory
+    _INSTANCES.pop(name, None)
+
+def get(device: str) -> Backend:
+    if device not in BACKENDS:
+        raise exceptions.DeviceError(device)
+    if device not in _INSTANCES:
+        _INSTANCES[device] = BACKENDS[device]()
+    return _INSTANCES[device]
+
+register("cpu", Backend)
+register("cpu-jit", JitBackend)
@@ -0,0 +1,78 @@
+import concurrent.futures
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from . import ir
+from . import quantum
+
+def _describe(circuit: quantum.Circuit) -> tuple[int, str, np.ndarray]:
+    return circuit.qubits, circuit.device, circuit.instructions.array.copy()
+
+def _run_chunk(name: str, dtype: str, total: int, tasks: list, shots: int) -> None:
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        results = np.ndarray((total,), dtype=dtype, buffer=memory.buf)
+        for offset, (qubits, device, instructions), seed in tasks:
+            circuit = quantum.Circuit(qubits, device)
+            circuit.instructions = ir.Instructions.from_array(instructions)
+            probabilities = np.abs(circuit(0).ravel()) ** 2
+            probabilities /= probabilities.sum()
+            output = results[offset:offset + 2 ** qubits]
+            if shots:
+                output[:] = np.random.default_rng(seed).multinomial(shots, probabilities)
+            else:
+                output[:] = probabilities
+            del output
+        del results
+    finally:
+        memory.close()
+
+def run_many(circuits: list[quantum.Circuit], shots: int = 0, workers: int | None = None, seed: int | None = None, chunksize: int | None = None) -> list[np.ndarray]:
+    """
+    Run many independent circuits from the all-zeros state on a process pool.
+
+    Circuits are sent to workers as compact instruction arrays, and workers write
+    their results straight into one preallocated shared memory block instead of
+    pickling them back. Each circuit gets its own RNG stream spawned from
+    `np.random.SeedSequence(seed)`, so counts do not depend on `workers` or `chunksize`.
+
+    Args:
+        circuits: The circuits to run.
+        shots (int): Number of samples per circuit, or 0 for exact probability vectors.
+        workers (int | None): Number of worker processes; 1 runs in this process.
+        seed (int | None): Root seed for sampling.
+        chunksize (int | None): Circuits per task, by default spread evenly over four tasks per worker.
+
+    Returns:
+        list[np.ndarray]: One vector of length 2^n per circuit, either int64 counts
+        or float64 probabilities, all views into a single contiguous array.
+    """
+    circuits = list(circuits)
+    workers = workers or os.cpu_count() or 1
+    dtype = np.dtype(np.int64 if shots else np.float64)
+    sizes = [2 ** circuit.qubits for circuit in circuits]
+    offsets = np.concatenate(([0], np.cumsum(sizes, dtype=np.int64)))
+    total = int(offsets[-1])
+    seeds = np.random.SeedSequence(seed).spawn(len(circuits))
+    tasks = [(int(offset), _describe(circuit), child) for offset, circuit, child in zip(offsets, circuits, seeds)]
+    if chunksize is None:
+        chunksize = max(1, -(-len(tasks) // (4 * workers)))
+    chunks = [tasks[i:i + chunksize] for i in range(0, len(tasks), chunksize)]
+
+    memory = shared_memory.SharedMemory(create=True, size=max(total * dtype.itemsize, 1))
+    try:
+        if workers == 1:
+            for chunk in chunks:
+                _run_chunk(memory.name, dtype.str, total, chunk, shots)
+        else:
+            with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+                for future in [pool.submit(_run_chunk, memory.name, dtype.str, total, chunk, shots) for chunk in chunks]:
+                    future.result()
+        results = np.ndarray((total,), dtype=dtype, buffer=memory.buf).copy()
+    finally:
+        memory.close()
+        memory.unlink()
+
+    return [results[offsets[i]:offsets[i + 1]] for i in range(len(circuits))]
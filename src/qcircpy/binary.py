@@ -0,0 +1,230 @@
+import io
+import os
+import typing
+
+import numpy as np
+
+from . import exceptions
+from . import ir
+from . import quantum
+
+MAGIC = b"QCPY"
+
+VERSION = 1
+
+ALIGNMENT = 64
+
+HEADER = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u2"),
+    ("sections", "<u2"),
+    ("qubits", "<u4"),
+    ("device", "S20"),
+])
+
+SECTION = np.dtype([
+    ("kind", "<u4"),
+    ("width", "<u4"),
+    ("offset", "<u8"),
+    ("count", "<u8"),
+])
+
+INSTRUCTIONS, COUNTS, PROBABILITIES, STATE = 1, 2, 3, 4
+
+# On-disk layouts are fixed little-endian so files move between machines.
+# Readers skip section kinds they do not know.
+LAYOUTS = {
+    INSTRUCTIONS: ir.INSTRUCTION.newbyteorder("<"),
+    COUNTS: np.dtype([("outcome", "<u8"), ("count", "<u8")]),
+    PROBABILITIES: np.dtype("<f8"),
+    STATE: np.dtype("<c16"),
+}
+
+
+class Record:
+    """
+    The contents of a binary file: a circuit and any results stored with it.
+
+    Attributes:
+        version (int): The schema version the file was written with.
+        qubits (int): The number of qubits.
+        circuit (quantum.Circuit | None): The circuit, if one was stored.
+        counts (dict[str, int] | None): Measured bitstring counts.
+        probabilities (np.ndarray | None): A probability vector.
+        state (np.ndarray | None): A (2^n,) state vector.
+
+    The arrays are read-only views into the loaded buffer or memory map.
+    """
+
+    def __init__(self, version: int, qubits: int, circuit: quantum.Circuit | None, counts: dict[str, int] | None,
+                 probabilities: np.ndarray | None, state: np.ndarray | None) -> None:
+        self.version = version
+        self.qubits = qubits
+        self.circuit = circuit
+        self.counts = counts
+        self.probabilities = probabilities
+        self.state = state
+
+    def __repr__(self) -> str:
+        present = [name for name in ("circuit", "counts", "probabilities", "state") if getattr(self, name) is not None]
+        return f"Record(version={self.version}, qubits={self.qubits}, sections={present})"
+
+
+def _sections(circuit: quantum.Circuit | None, counts: dict[str, int] | None, probabilities: np.ndarray | None, state: np.ndarray | None) -> list[tuple[int, int, np.ndarray]]:
+    sections = []
+    if circuit is not None:
+        sections.append((INSTRUCTIONS, ir.MAX_ARITY, circuit.instructions.array))
+    if counts is not None:
+        width = len(next(iter(counts), ""))
+        table = np.empty(len(counts), dtype=LAYOUTS[COUNTS])
+        table["outcome"] = [int(outcome, 2) for outcome in counts]
+        table["count"] = list(counts.values())
+        sections.append((COUNTS, width, table))
+    if probabilities is not None:
+        sections.append((PROBABILITIES, 0, np.ravel(probabilities)))
+    if state is not None:
+        sections.append((STATE, 0, np.ravel(state)))
+    return sections
+
+def _align(position: int) -> int:
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+def dump(file: str | os.PathLike | typing.BinaryIO, circuit: quantum.Circuit | None = None, counts: dict[str, int] | None = None,
+         probabilities: np.ndarray | None = None, state: np.ndarray | None = None, qubits: int | None = None) -> None:
+    """
+    Write a circuit and optional results in the versioned binary format.
+
+    The file is a fixed header, a table of (kind, width, offset, count)
+    section entries and the sections themselves, each a raw little-endian
+    array aligned to 64 bytes: the `ir.INSTRUCTION` records, (outcome, count)
+    pairs, float64 probabilities and complex128 amplitudes.
+
+    Args:
+        file: A path or a binary file opened for writing.
+        circuit (quantum.Circuit | None): The circuit.
+        counts (dict[str, int] | None): Bitstring counts, as returned by `executor.Executor.run`.
+        probabilities (np.ndarray | None): A probability vector.
+        state (np.ndarray | None): A state vector, stored flat.
+        qubits (int | None): The register size, required when no circuit is given.
+
+    Raises:
+        ValueError: If neither a circuit nor `qubits` is given, or the device
+            name does not fit the 20-byte header field.
+    """
+    if circuit is None and qubits is None:
+        raise ValueError("Pass a circuit or the number of qubits.")
+    device = (circuit.device if circuit is not None else "").encode()
+    if len(device) > HEADER["device"].itemsize:
+        raise ValueError(f"Device name {device.decode()!r} is longer than {HEADER['device'].itemsize} bytes.")
+    sections = _sections(circuit, counts, probabilities, state)
+
+    header = np.zeros(1, dtype=HEADER)
+    header["magic"] = MAGIC
+    header["version"] = VERSION
+    header["sections"] = len(sections)
+    header["qubits"] = circuit.qubits if circuit is not None else qubits
+    header["device"] = device
+
+    table = np.zeros(len(sections), dtype=SECTION)
+    position = _align(HEADER.itemsize + table.nbytes)
+    for entry, (kind, width, array) in zip(table, sections):
+        entry["kind"], entry["width"], entry["offset"], entry["count"] = kind, width, position, len(array)
+        position = _align(position + len(array) * LAYOUTS[kind].itemsize)
+
+    def write(handle: typing.BinaryIO) -> None:
+        handle.write(header.tobytes())
+        handle.write(table.tobytes())
+        written = HEADER.itemsize + table.nbytes
+        for entry, (kind, _, array) in zip(table, sections):
+            handle.write(bytes(int(entry["offset"]) - written))
+            data = np.ascontiguousarray(array, dtype=LAYOUTS[kind])
+            handle.write(memoryview(data).cast("B"))
+            written = int(entry["offset"]) + data.nbytes
+
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "wb") as handle:
+            write(handle)
+    else:
+        write(file)
+
+def dumps(circuit: quantum.Circuit | None = None, counts: dict[str, int] | None = None, probabilities: np.ndarray | None = None,
+          state: np.ndarray | None = None, qubits: int | None = None) -> bytes:
+    buffer = io.BytesIO()
+    dump(buffer, circuit, counts, probabilities, state, qubits)
+    return buffer.getvalue()
+
+def loads(data: bytes | bytearray | memoryview | np.ndarray, device: str | None = None) -> Record:
+    """
+    Read a binary record from a buffer without copying the result sections.
+
+    Args:
+        data: The file contents, as any object exposing the buffer protocol.
+        device (str | None): The device of the returned circuit, by default the stored one.
+
+    Returns:
+        Record: The circuit and results. Only the instructions are copied, in
+        a single bulk conversion into the circuit's IR.
+
+    Raises:
+        FormatError: If the magic, version or section table is invalid, or an
+            instruction has an unknown opcode, a qubit outside the register or
+            padding other than -1 past its arity.
+    """
+    data = np.frombuffer(data, dtype=np.uint8)
+    if len(data) < HEADER.itemsize:
+        raise exceptions.FormatError("truncated header")
+    header = np.frombuffer(data, dtype=HEADER, count=1)[0]
+    if header["magic"] != MAGIC:
+        raise exceptions.FormatError("not a qcircpy binary file")
+    version = int(header["version"])
+    if version > VERSION:
+        raise exceptions.FormatError(f"schema version {version} is newer than the supported version {VERSION}")
+    count = int(header["sections"])
+    if len(data) < HEADER.itemsize + count * SECTION.itemsize:
+        raise exceptions.FormatError("truncated section table")
+    table = np.frombuffer(data, dtype=SECTION, count=count, offset=HEADER.itemsize)
+    qubits = int(header["qubits"])
+
+    found = {}
+    for kind, width, offset, length in table.tolist():
+        if kind not in LAYOUTS:
+            continue
+        if offset + length * LAYOUTS[kind].itemsize > len(data):
+            raise exceptions.FormatError(f"section {kind} runs past the end of the data")
+        array = np.frombuffer(data, dtype=LAYOUTS[kind], count=length, offset=offset)
+        if not array.dtype.isnative:
+            array = array.astype(array.dtype.newbyteorder("="))
+        array.flags.writeable = False
+        found[kind] = (width, array)
+
+    circuit = None
+    if INSTRUCTIONS in found:
+        array = found[INSTRUCTIONS][1]
+        if len(array) and int(array["opcode"].max()) >= len(ir.OPCODES):
+            raise exceptions.FormatError("unknown opcode")
+        # Slots up to each opcode's arity hold qubits of the register and the rest hold -1.
+        used = np.arange(ir.MAX_ARITY) < ir.ARITY[array["opcode"]][:, None]
+        slots = array["qubits"]
+        if np.where(used, (slots < 0) | (slots >= qubits), slots != -1).any():
+            raise exceptions.FormatError(f"instruction qubits out of range for {qubits} qubits or badly padded")
+        circuit = quantum.Circuit(qubits, header["device"].decode() if device is None else device)
+        circuit.instructions = ir.Instructions.from_array(array)
+
+    counts = None
+    if COUNTS in found:
+        width, table = found[COUNTS]
+        counts = {f"{outcome:0>{width}b}": count for outcome, count in zip(table["outcome"].tolist(), table["count"].tolist())}
+
+    probabilities = found[PROBABILITIES][1] if PROBABILITIES in found else None
+    state = found[STATE][1] if STATE in found else None
+    return Record(version, qubits, circuit, counts, probabilities, state)
+
+def load(file: str | os.PathLike, device: str | None = None, mmap: bool = True) -> Record:
+    """
+    Read a binary record from a file, memory mapping it by default so the
+    probability and state sections are paged in only when used.
+    """
+    if mmap:
+        return loads(np.memmap(file, dtype=np.uint8, mode="r"), device)
+    with open(file, "rb") as handle:
+        return loads(handle.read(), device)
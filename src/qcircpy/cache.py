@@ -0,0 +1,85 @@
+import collections
+import hashlib
+
+from . import engine
+from . import ir
+from . import quantum
+
+def key(circuit: quantum.Circuit, state: str) -> bytes:
+    digest = hashlib.sha256()
+    digest.update(f"{circuit.qubits}:{circuit.device}:{state}:".encode())
+    digest.update(circuit.instructions.array.tobytes())
+    return digest.digest()
+
+
+class PrefixCache:
+    """
+    LRU cache of the states reached after running circuit prefixes.
+
+    Entries are keyed by a hash of the prefix's instruction list, qubit count,
+    device and initial state. Lookups return copy-on-write forks of the cached
+    runtime, so N variants sharing a prefix cost one prefix simulation plus N
+    suffixes, and the cached state is only copied if a variant measures before
+    applying a gate. Prefixes containing MEASURE are random, so they are run
+    afresh on every call and never cached.
+
+    Args:
+        budget (int): Maximum total bytes of cached states. States larger than
+            the budget are simulated but not cached.
+    """
+
+    def __init__(self, budget: int = 1 << 30) -> None:
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.__entries = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def runtime(self, prefix: quantum.Circuit, state: str | None = None) -> engine.Runtime:
+        """
+        Get a fork of the runtime obtained by running `prefix` from `state`.
+
+        Args:
+            prefix (quantum.Circuit): The shared prefix.
+            state (str | None): The initial basis state, all zeros by default.
+
+        Returns:
+            engine.Runtime: A fork that can be modified freely.
+        """
+        state = "0" * prefix.qubits if state is None else state
+        if (prefix.instructions.array["opcode"] == ir.MEASURE).any():
+            self.misses += 1
+            runtime = engine.Runtime(state, prefix.device)
+            runtime.run(prefix)
+            return runtime
+
+        entry = key(prefix, state)
+        if entry in self.__entries:
+            self.hits += 1
+            self.__entries.move_to_end(entry)
+            return self.__entries[entry].fork()
+
+        self.misses += 1
+        runtime = engine.Runtime(state, prefix.device)
+        runtime.run(prefix)
+        nbytes = runtime.get_state().nbytes
+        if nbytes <= self.budget:
+            while self.size + nbytes > self.budget:
+                _, evicted = self.__entries.popitem(last=False)
+                self.size -= evicted.get_state().nbytes
+            self.__entries[entry] = runtime
+            self.size += nbytes
+            return runtime.fork()
+        return runtime
+
+    def run(self, prefix: quantum.Circuit, suffix: quantum.Circuit, state: str | None = None) -> engine.Runtime:
+        runtime = self.runtime(prefix, state)
+        runtime.run(suffix)
+        return runtime
+
+    def clear(self) -> None:
+        self.__entries.clear()
+        self.size = 0
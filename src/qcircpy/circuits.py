@@ -0,0 +1,150 @@
+import abc
+
+import numpy as np
+
+from . import backends
+from . import exceptions
+from . import kernels
+
+
+class KroneckerOperator:
+    """
+    A lazy Kronecker product A_1 ⊗ A_2 ⊗ ... ⊗ A_m of square factors.
+
+    The product is never materialised. Applying it to a state applies each
+    factor to its own block of adjacent qubit axes in turn, so the cost is
+    O(Σ 2^n · 2^k_i) rather than O(4^n) for the explicit matrix.
+
+    Args:
+        *factors (np.ndarray): Square matrices of size 2^k_i, the first acting on the
+            most significant qubits.
+
+    Attributes:
+        factors (list[np.ndarray]): The factors.
+        widths (list[int]): The number of qubits each factor acts on.
+        qubits (int): The total number of qubits.
+    """
+
+    def __init__(self, *factors: np.ndarray) -> None:
+        self.factors = [np.asarray(factor) for factor in factors]
+        self.widths = []
+        for factor in self.factors:
+            size = factor.shape[0]
+            if factor.ndim != 2 or factor.shape[1] != size or size < 2 or size & (size - 1) != 0:
+                raise exceptions.StateError(str(factor.shape))
+            self.widths.append(size.bit_length() - 1)
+        self.identity = [np.array_equal(factor, np.identity(len(factor))) for factor in self.factors]
+        self.qubits = sum(self.widths)
+        self.shape = (2 ** self.qubits, 2 ** self.qubits)
+
+    def __matmul__(self, state: np.ndarray) -> np.ndarray:
+        if state.shape[0] != self.shape[1]:
+            raise exceptions.StateError(str(state.shape))
+        offset = 0
+        for factor, width, identity in zip(self.factors, self.widths, self.identity):
+            if not identity:
+                state = kernels.apply(state, factor, tuple(range(offset, offset + width)))
+            offset += width
+        return state
+
+
+def extend(gate: np.ndarray, space: int) -> KroneckerOperator:
+    """
+    Lazily repeat a gate on `space` adjacent blocks of qubits: gate ⊗ gate ⊗ ... ⊗ gate.
+    """
+    return KroneckerOperator(*[gate] * space)
+
+
+class Component(abc.ABC):
+    def __init__(self) -> None:
+        self.device = None
+        self.in_channels = 0
+        self.out_channels = 0
+
+    def __call__(self, state: np.ndarray) -> np.ndarray:
+        return self.parse(state)
+
+    @abc.abstractmethod
+    def parse(self, state: np.ndarray) -> np.ndarray:
+        ...
+
+
+class Wire(Component):
+    """
+    Represents a wire in a quantum circuit.
+
+    Attributes:
+        gates (list): The gates applied to the wire, in order.
+        matrix (ndarray): The product of the gates, of size 2^k for a k-qubit wire.
+            The first gate is applied first, so for gates g0, g1, g2 it is
+            g2 @ g1 @ g0. The archived Wire built g1 @ g0 @ g2 instead.
+
+    Methods:
+        parse(state): Applies the gates to a state of the wire's qubits.
+    """
+
+    def __init__(self, device: str, *args: np.ndarray) -> None:
+        self.device = device
+        self.backend = backends.get(device)
+        self.module = self.backend.module
+
+        if not args:
+            raise exceptions.StateError("empty wire")
+        self.gates = [self.module.asarray(gate) for gate in args]
+        self.matrix = self.gates[0]
+        for gate in self.gates[1:]:
+            if gate.shape != self.matrix.shape:
+                raise exceptions.StateError(str(gate.shape))
+            self.matrix = gate @ self.matrix
+
+        self.in_channels = self.matrix.shape[0].bit_length() - 1
+        self.out_channels = self.in_channels
+
+    def parse(self, state: np.ndarray) -> np.ndarray:
+        if state.shape[0] != self.matrix.shape[1]:
+            raise exceptions.StateError(str(state.shape))
+        return self.matrix @ state
+
+
+class Connection(Component):
+    """
+    Runs several wires in parallel after an optional gate across them.
+
+    The wires are combined with a `KroneckerOperator`, so a connection of m
+    wires over n qubits costs O(Σ 2^n · 2^k_i) per application and never
+    builds the 2^n x 2^n product.
+
+    Args:
+        device (str): The device, a name registered in `backends`.
+        gate (np.ndarray | None): A gate applied first, to `qubits`.
+        *args (Wire): The wires, the first on the most significant qubits.
+        qubits: The qubits `gate` acts on, by default the first log2(len(gate)) qubits.
+    """
+
+    def __init__(self, device: str, gate: np.ndarray | None, *args: Wire, qubits: tuple[int, ...] | None = None) -> None:
+        self.device = device
+        self.backend = backends.get(device)
+        self.module = self.backend.module
+
+        for wire in args:
+            if not isinstance(wire, Wire):
+                raise TypeError("Connection only accepts Wire objects.")
+        self.wires = list(args)
+        self.operator = KroneckerOperator(*[wire.matrix for wire in self.wires])
+        self.in_channels = self.operator.qubits
+        self.out_channels = self.operator.qubits
+
+        self.gate = None if gate is None else self.module.asarray(gate)
+        self.qubits = None
+        if self.gate is not None:
+            width = self.gate.shape[0].bit_length() - 1
+            self.qubits = tuple(range(width)) if qubits is None else tuple(qubits)
+            if len(self.qubits) != width or any(qubit < 0 or qubit >= self.in_channels for qubit in self.qubits):
+                raise exceptions.StateError(str(self.qubits))
+
+    def parse(self, state: np.ndarray) -> np.ndarray:
+        if state.shape[0] != 2 ** self.in_channels:
+            raise exceptions.StateError(str(state.shape))
+        if self.gate is not None:
+            state = kernels.apply(state, self.gate, self.qubits)
+        return self.operator @ state
@@ -1,183 +1,334 @@
+import numbers
+
 from .exceptions import *
-from . import gates
+from . import backends
+from . import states
+from . import ir
+from . import quantum
+from .sparse import CSR
 
 import numpy as np
 import matplotlib.pyplot as plt
 
 class Runtime:
     def __init__(self, state: str = "0", device: str = "cpu") -> None:
-        self.space = 2 ** len(state)
-        self.qubits = len(state)
+        self.__setup(len(state), device)
+        self.__state = states.basis_state(states.basis_index(state), self.qubits, self.module)
+
+    @classmethod
+    def from_index(cls, index: int, qubits: int, device: str = "cpu") -> "Runtime":
+        runtime = cls.__new__(cls)
+        runtime.__setup(qubits, device)
+        runtime.__state = states.basis_state(index, qubits, runtime.module)
+        return runtime
+
+    @classmethod
+    def from_amplitudes(cls, amplitudes, device: str = "cpu", atol: float = 1e-8) -> "Runtime":
+        state = states.adopt(amplitudes, atol)
+        runtime = cls.__new__(cls)
+        runtime.__setup(state.shape[0].bit_length() - 1, device)
+        runtime.__state = state
+        # The adopted buffer belongs to the caller: treat it as shared so the first
+        # in-place update (controlled gates, measure, in-place backends) copies it.
+        runtime.__shared = True
+        return runtime
+
+    def __setup(self, qubits: int, device: str) -> None:
+        self.space = 2 ** qubits
+        self.qubits = qubits
         self.device = device
-        if device != "cpu" and device != "gpu":
-            raise DeviceError(device)
-        elif device == "cpu":
-            self.module = np
-        
-        if state[0] == "1":
-            output = self.module.array([[0], [1]], dtype=complex)
-        elif state[0] == "0":
-            output = self.module.array([[1], [0]], dtype=complex)
-
-        for i, bit in enumerate(state[1:]):
-            if bit == "1":
-                qubit = self.module.array([[0], [1]], dtype=complex)
-            elif bit == "0":
-                qubit = self.module.array([[1], [0]], dtype=complex)
+        self.backend = backends.get(device)
+        self.module = self.backend.module
+        self.__shared = False
+        self.version = 0
+        self.__distributions = {}
+
+    def __update(self, state: np.ndarray) -> None:
+        self.__state = state
+        self.__shared = False
+        self.__modified()
+
+    def __modified(self) -> None:
+        self.version += 1
+        self.__distributions = {}
+
+    def __own(self) -> None:
+        if self.__shared:
+            self.__state = self.__state.copy()
+            self.__shared = False
+
+    def fork(self) -> "Runtime":
+        runtime = Runtime.__new__(Runtime)
+        runtime.__setup(self.qubits, self.device)
+        runtime.__state = self.__state
+        runtime.__shared = True
+        runtime.version = self.version
+        runtime.__distributions = dict(self.__distributions)
+        self.__shared = True
+        return runtime
+
+    def run(self, circuit: quantum.Circuit) -> None:
+        if circuit.qubits != self.qubits:
+            raise StateError(str(circuit.qubits))
+        for opcode, qubits, param in circuit.instructions:
+            if opcode == ir.MEASURE:
+                self.measure([qubits[0]])
             else:
-                raise StateError(state)
-            output = self.module.kron(output, qubit)
-        
-        self.__state = output
+                if self.backend.inplace:
+                    self.__own()
+                self.__update(self.backend.apply(self.__state, ir.matrix(opcode, param, self.device), qubits))
     
-    def measure(self) -> str:
-        probabilities = np.abs(self.__state) ** 2
-        probabilities = probabilities.flatten()
-        output_states = [str(i) for i in range(len(probabilities))]
-        output = np.random.choice(output_states, p=probabilities)
-        self.__state = self.module.zeros((2 ** self.qubits, 1), dtype=complex)
-        self.__state[int(output),0] = 1
-        output = f"{bin(int(output))[2:]:0>{self.qubits}}"
-        return output
+    def measure(self, qubits: list[int] | None = None) -> str:
+        qubits = self.__check_measured(qubits)
+        if not qubits:
+            return ""
+        probabilities, cdf = self.__distribution(qubits)
+        index = self.__sample(cdf)
+        output = f"{index:0>{len(qubits)}b}"
 
-    def measure_no_reset(self) -> str:
-        probabilities = np.abs(self.__state) ** 2
-        probabilities = probabilities.flatten()
-        output_states = [str(i) for i in range(len(probabilities))]
-        output = np.random.choice(output_states, p=probabilities)
-        output = f"{bin(int(output))[2:]:0>{self.qubits}}"
+        self.__own()
+        state = self.__state.reshape((2,) * self.qubits)
+        for qubit, bit in zip(qubits, output):
+            mask = [slice(None)] * self.qubits
+            mask[qubit] = 1 - int(bit)
+            state[tuple(mask)] = 0
+        state *= 1 / np.sqrt(probabilities[index])
+        self.__modified()
         return output
-    
-    def __single_qubit_gate(self, gate: np.ndarray, qubit: int) -> np.ndarray:
-        identity = self.module.identity(2, dtype=complex)
 
-        if qubit == 0:
-            applied_gate = gate
-        else:
-            applied_gate = identity
-        for i in range(1, self.qubits):
-            if i == qubit:
-                applied_gate = self.module.kron(applied_gate, gate)
+    def measure_no_reset(self, qubits: list[int] | None = None) -> str:
+        qubits = self.__check_measured(qubits)
+        if not qubits:
+            return ""
+        _, cdf = self.__distribution(qubits)
+        return f"{self.__sample(cdf):0>{len(qubits)}b}"
+
+    def probabilities(self) -> np.ndarray:
+        """
+        The probability of each basis state, computed once per state version.
+
+        Returns:
+            np.ndarray: A read-only array of 2^n probabilities summing to 1.
+        """
+        return self.__distribution(list(range(self.qubits)))[0]
+
+    def cdf(self) -> np.ndarray:
+        """
+        The cumulative sum of `probabilities()`, computed once per state version.
+
+        Returns:
+            np.ndarray: A read-only, non-decreasing array of 2^n values ending at 1.
+        """
+        return self.__distribution(list(range(self.qubits)))[1]
+
+    def marginal_probabilities(self, qubits: list[int] | list[list[int]]) -> np.ndarray | list[np.ndarray]:
+        """
+        Exact outcome probabilities of measuring a subset of qubits, with the other
+        qubits summed out of |ψ|² on per-qubit axes.
+
+        Args:
+            qubits: One subset, or a list of subsets sharing a single |ψ|² pass.
+
+        Returns:
+            np.ndarray | list[np.ndarray]: Read-only arrays of 2^k probabilities, indexed
+            by the bits of each subset in the given order.
+        """
+        subsets, many = self.__subsets(qubits)
+        if many:
+            self.probabilities()
+        output = [self.__distribution(subset)[0] for subset in subsets]
+        return output if many else output[0]
+
+    def reduced_density_matrix(self, qubits: list[int] | list[list[int]]) -> np.ndarray | list[np.ndarray]:
+        """
+        The reduced density matrix of a subset of qubits, tracing out the rest with
+        one tensordot of the state against its conjugate.
+
+        Args:
+            qubits: One subset, or a list of subsets.
+
+        Returns:
+            np.ndarray | list[np.ndarray]: (2^k, 2^k) density matrices, with tensor
+            factors in the given qubit order.
+        """
+        subsets, many = self.__subsets(qubits)
+        tensor = self.__state.reshape((2,) * self.qubits)
+        conjugate = tensor.conj()
+        output = []
+        for subset in subsets:
+            traced = tuple(i for i in range(self.qubits) if i not in subset)
+            matrix = np.tensordot(tensor, conjugate, axes=(traced, traced))
+            order = [sorted(subset).index(qubit) for qubit in subset]
+            matrix = matrix.transpose(order + [len(subset) + position for position in order])
+            output.append(matrix.reshape(2 ** len(subset), 2 ** len(subset)))
+        return output if many else output[0]
+
+    def __subsets(self, qubits: list[int] | list[list[int]]) -> tuple[list[list[int]], bool]:
+        qubits = list(qubits)
+        many = bool(qubits) and np.ndim(qubits[0]) > 0
+        subsets = [self.__check_measured(subset) for subset in (qubits if many else [qubits])]
+        return subsets, many
+
+    def __distribution(self, qubits: list[int]) -> tuple[np.ndarray, np.ndarray]:
+        # Cached per state version and measured qubits; gates and collapses bump the
+        # version through __update or __modified.
+        key = tuple(qubits)
+        if key not in self.__distributions:
+            everything = tuple(range(self.qubits))
+            if key == everything:
+                probabilities = np.abs(self.__state.ravel()) ** 2
+                probabilities /= probabilities.sum()
             else:
-                applied_gate = self.module.kron(applied_gate, identity)
-        return applied_gate
-        
+                probabilities = self.__marginal(qubits)
+            cdf = np.cumsum(probabilities)
+            probabilities.flags.writeable = False
+            cdf.flags.writeable = False
+            self.__distributions[key] = (probabilities, cdf)
+        return self.__distributions[key]
+
+    def __sample(self, cdf: np.ndarray) -> int:
+        return min(int(np.searchsorted(cdf, np.random.random() * cdf[-1], side="right")), len(cdf) - 1)
+
+    def __check_measured(self, qubits: list[int] | None) -> list[int]:
+        if qubits is None:
+            return list(range(self.qubits))
+        qubits = list(qubits)
+        for qubit in qubits:
+            self.__check_qubit(qubit)
+        if len(set(qubits)) != len(qubits):
+            raise StateError(str(qubits))
+        return qubits
+
+    def __marginal(self, qubits: list[int]) -> np.ndarray:
+        everything = tuple(range(self.qubits))
+        if everything in self.__distributions:
+            probabilities = self.__distributions[everything][0].reshape((2,) * self.qubits)
+        else:
+            probabilities = np.abs(self.__state.reshape((2,) * self.qubits)) ** 2
+        unmeasured = tuple(i for i in range(self.qubits) if i not in qubits)
+        if unmeasured:
+            probabilities = probabilities.sum(axis=unmeasured)
+        order = sorted(qubits)
+        probabilities = probabilities.transpose([order.index(qubit) for qubit in qubits])
+        probabilities = probabilities.ravel()
+        return probabilities / probabilities.sum()
+    
     def __check_qubit(self, qubit: int) -> None:
         if qubit < 0 or qubit >= self.qubits:
             raise StateError(str(qubit))
     
-    def get_state(self) -> np.ndarray:
-        return self.__state
+    def get_state(self, copy: bool = False, flat: bool = False) -> np.ndarray:
+        """
+        The state vector, as a read-only view by default.
+
+        The view shares memory with the runtime, which copies its buffer before
+        any later in-place update, so the view keeps its current amplitudes.
+
+        Args:
+            copy (bool): Return a writeable copy instead of a view.
+            flat (bool): Return shape (2^n,) instead of the (2^n, 1) column.
+
+        Returns:
+            np.ndarray: The amplitudes, qubit 0 being the most significant bit.
+        """
+        if copy:
+            state = self.__state.copy()
+        else:
+            self.__shared = True
+            state = self.__state.view()
+            state.flags.writeable = False
+        return state.reshape(-1) if flat else state
+
+    def export(self, flat: bool = False) -> states.StateView:
+        """
+        Export the state without copying, for NumPy, DLPack or buffer protocol consumers.
+        """
+        return states.StateView(self.get_state(flat=flat))
+
+    def __check_qubits(self, *qubits: int) -> None:
+        for qubit in qubits:
+            self.__check_qubit(qubit)
+        if len(set(qubits)) != len(qubits):
+            raise StateError(str(qubits))
+
+    def __apply(self, gate: np.ndarray, *qubits: int) -> None:
+        self.__check_qubits(*qubits)
+        if self.backend.inplace:
+            self.__own()
+        self.__update(self.backend.apply(self.__state, gate, qubits))
+
+    def __controlled(self, gate: np.ndarray, controls: tuple[int, ...], target: int) -> None:
+        self.mcgate(gate, target, controls)
+
+    def mcgate(self, gate: np.ndarray, targets: int | tuple[int, ...], controls: tuple[int, ...], control_states: str | tuple[int, ...] | None = None) -> None:
+        """
+        Apply a gate to `targets` only where every control qubit is in its control
+        state, with no ancillas and no expanded matrix. On the NumPy backend the
+        matching 2^(n-k) amplitudes for k controls are gathered from a strided
+        view into one temporary of that size, transformed and written back, so
+        only they are read and written. The Numba loop instead scans all
+        amplitude pairs and skips those outside the subspace.
+
+        Args:
+            gate (np.ndarray): A (2^t, 2^t) gate, such as X, Z or any unitary.
+            targets: The target qubit, or a tuple of them in the gate's order.
+            controls: The control qubits.
+            control_states: The value each control must have, as a bit string
+                such as "101" or a sequence of 0s and 1s. All 1 by default;
+                0 entries are negative controls.
+        """
+        targets = (targets,) if isinstance(targets, numbers.Integral) else tuple(targets)
+        controls = tuple(controls)
+        if not all(isinstance(qubit, numbers.Integral) for qubit in controls + targets):
+            raise StateError(str(controls + targets))
+        targets = tuple(int(target) for target in targets)
+        controls = tuple(int(control) for control in controls)
+        self.__check_qubits(*controls, *targets)
+        if len(gate) != 2 ** len(targets):
+            raise StateError(str(np.shape(gate)))
+        if control_states is not None:
+            control_states = tuple(int(bit) for bit in control_states)
+            if len(control_states) != len(controls) or any(bit != 0 and bit != 1 for bit in control_states):
+                raise StateError(str(control_states))
+        self.__own()
+        self.__update(self.backend.controlled(self.__state, gate, controls, targets, control_states))
+
+    def apply_operator(self, operator: np.ndarray | CSR) -> None:
+        """
+        Apply a full 2^n x 2^n operator: a dense array, a `sparse.CSR` (for example
+        from `Circuit.compile(sparse=True)` or `gates.controlled_gate(..., sparse=True)`)
+        or a SciPy sparse matrix, using a sparse matvec for the sparse forms.
+        """
+        if tuple(operator.shape) != (self.space, self.space):
+            raise StateError(str(operator.shape))
+        self.__update(np.asarray(operator @ self.__state, dtype=complex))
 
     def gate(self, gate: np.ndarray, qubit: int) -> None:
-        self.__check_qubit(qubit)
-        
-        self.__state = self.__single_qubit_gate(gate, qubit) @ self.__state
+        self.__apply(gate, qubit)
     
     def hadamard(self, qubit: int) -> None:
-        self.__check_qubit(qubit)
-        
-        hadamard = gates.GATES[self.device]["HADAMARD"]
-        self.__state = self.__single_qubit_gate(hadamard, qubit) @ self.__state
+        self.__apply(self.backend.gates["HADAMARD"], qubit)
     
     def pauli_x(self, qubit: int) -> None:
-        self.__check_qubit(qubit)
-        
-        pauli_x = gates.GATES[self.device]["PAULI_X"]
-        self.__state = self.__single_qubit_gate(pauli_x, qubit) @ self.__state
+        self.__apply(self.backend.gates["PAULI_X"], qubit)
     
     def pauli_y(self, qubit: int) -> None:
-        self.__check_qubit(qubit)
-        
-        pauli_y = gates.GATES[self.device]["PAULI_Y"]
-        self.__state = self.__single_qubit_gate(pauli_y, qubit) @ self.__state
+        self.__apply(self.backend.gates["PAULI_Y"], qubit)
     
     def pauli_z(self, qubit: int) -> None:
         self.__check_qubit(qubit)
-        
-        pauli_z = gates.GATES[self.device]["PAULI_Z"]
-        self.__state = self.__single_qubit_gate(pauli_z, qubit) @ self.__state
+        if self.backend.inplace:
+            self.__own()
+        self.__update(self.backend.diagonal(self.__state, self.module.array([1, -1], dtype=complex), (qubit,)))
     
     def cnot(self, control: int, target: int) -> None:
-        if control < 0 or control >= self.qubits:
-            raise StateError(str(control))
-        if target < 0 or target >= self.qubits:
-            raise StateError(str(target))
-        
-        cnot = gates.GATES[self.device]["CNOT"]
-        identity = self.module.identity(2, dtype=complex)
-
-        if control == 0:
-            applied_gate = cnot
-        else:
-            applied_gate = identity
-        for i in range(1, self.qubits-1):
-            if i == control:
-                applied_gate = self.module.kron(applied_gate, cnot)
-            else:
-                applied_gate = self.module.kron(applied_gate, identity)
-        self.__state = applied_gate @ self.__state
+        self.__controlled(self.backend.gates["PAULI_X"], (control,), target)
     
     def swap(self, qubit1: int, qubit2: int) -> None:
-        if qubit1 < 0 or qubit1 >= self.qubits:
-            raise StateError(str(qubit1))
-        if qubit2 < 0 or qubit2 >= self.qubits:
-            raise StateError(str(qubit2))
-        
-        swap = gates.GATES[self.device]["SWAP"]
-        identity = self.module.identity(2, dtype=complex)
-
-        if qubit1 == 0:
-            applied_gate = swap
-        else:
-            applied_gate = identity
-        for i in range(1, self.qubits-1):
-            if i == qubit1:
-                applied_gate = self.module.kron(applied_gate, swap)
-            else:
-                applied_gate = self.module.kron(applied_gate, identity)
-        self.__state = applied_gate @ self.__state
+        self.__apply(self.backend.gates["SWAP"], qubit1, qubit2)
     
     def toffoli(self, control1: int, control2: int, target: int) -> None:
-        if control1 < 0 or control1 >= self.qubits:
-            raise StateError(str(control1))
-        if control2 < 0 or control2 >= self.qubits:
-            raise StateError(str(control2))
-        if target < 0 or target >= self.qubits:
-            raise StateError(str(target))
-        
-        toffoli = gates.GATES[self.device]["TOFFOLI"]
-        identity = self.module.identity(2, dtype=complex)
-
-        if control1 == 0:
-            applied_gate = toffoli
-        else:
-            applied_gate = identity
-        for i in range(1, self.qubits-2):
-            if i == control1:
-                applied_gate = self.module.kron(applied_gate, toffoli)
-            else:
-                applied_gate = self.module.kron(applied_gate, identity)
-        self.__state = applied_gate @ self.__state
+        self.__controlled(self.backend.gates["PAULI_X"], (control1, control2), target)
     
     def cswap(self, control: int, target1: int, target2: int) -> None:
-        if control < 0 or control >= self.qubits:
-            raise StateError(str(control))
-        if target1 < 0 or target1 >= self.qubits:
-            raise StateError(str(target1))
-        if target2 < 0 or target2 >= self.qubits:
-            raise StateError(str(target2))
-        
-        cswap = gates.GATES[self.device]["CSWAP"]
-        identity = self.module.identity(2, dtype=complex)
-
-        if control == 0:
-            applied_gate = cswap
-        else:
-            applied_gate = identity
-        for i in range(1, self.qubits-2):
-            if i == control:
-                applied_gate = self.module.kron(applied_gate, cswap)
-            else:
-                applied_gate = self.module.kron(applied_gate, identity)
-        self.__state = applied_gate @ self.__state
\ No newline at end of file
+        self.mcgate(self.backend.gates["SWAP"], (target1, target2), (control,))
\ No newline at end of file
@@ -8,4 +8,29 @@ class StateError(Exception):
     def __init__(self, state: str) -> None:
         self.state = state
         self.message = f"State {state} is invalid."
+        super().__init__(self.message)
+
+class AmplitudeError(Exception):
+    def __init__(self, reason: str) -> None:
+        self.reason = reason
+        self.message = f"Amplitudes are invalid: {reason}."
+        super().__init__(self.message)
+
+class ParseError(Exception):
+    def __init__(self, line: int, reason: str) -> None:
+        self.line = line
+        self.reason = reason
+        self.message = f"Line {line}: {reason}."
+        super().__init__(self.message)
+
+class ResourceError(Exception):
+    def __init__(self, reason: str) -> None:
+        self.reason = reason
+        self.message = f"Insufficient resources: {reason}."
+        super().__init__(self.message)
+
+class FormatError(Exception):
+    def __init__(self, reason: str) -> None:
+        self.reason = reason
+        self.message = f"Invalid file format: {reason}."
         super().__init__(self.message)
\ No newline at end of file
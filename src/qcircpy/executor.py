@@ -0,0 +1,157 @@
+import asyncio
+import concurrent.futures
+
+import numpy as np
+
+from . import ir
+from . import quantum
+
+def _simulate(qubits: int, device: str, instructions: np.ndarray, state: str | int, shots: list[int], seeds: list[int | None]) -> list[dict[str, int]]:
+    circuit = quantum.Circuit(qubits, device)
+    circuit.instructions = ir.Instructions.from_array(instructions)
+    probabilities = np.abs(circuit(state).ravel()) ** 2
+    probabilities /= probabilities.sum()
+
+    results = []
+    for count, seed in zip(shots, seeds):
+        histogram = np.random.default_rng(seed).multinomial(count, probabilities)
+        results.append({f"{index:0>{qubits}b}": int(histogram[index]) for index in np.flatnonzero(histogram)})
+    return results
+
+
+class _Job:
+    def __init__(self, circuit: quantum.Circuit, state: str | int, shots: int, seed: int | None, future: asyncio.Future) -> None:
+        self.qubits = circuit.qubits
+        self.device = circuit.device
+        self.instructions = circuit.instructions.array.copy()
+        self.state = state
+        self.shots = shots
+        self.seed = seed
+        self.future = future
+        self.key = (self.qubits, self.device, self.instructions.tobytes(), state)
+
+
+class Executor:
+    """
+    Asynchronous front end that runs circuits on a thread or process pool.
+
+    Jobs are queued with backpressure: `run` waits once `max_pending` jobs are
+    queued. Jobs that arrive within `batch_window` seconds of each other and
+    share a circuit and initial state are coalesced into one simulation, and
+    each job samples its own shots from the shared probabilities.
+
+    Args:
+        workers (int): Number of pool workers, and of batches in flight.
+        kind (str): "thread" or "process".
+        max_pending (int): Maximum number of queued jobs before `run` waits.
+        batch_window (float): Seconds to wait for more jobs before dispatching a batch.
+        max_batch (int): Maximum number of jobs coalesced into one batch.
+    """
+
+    def __init__(self, workers: int = 4, kind: str = "thread", max_pending: int = 1024, batch_window: float = 0.002, max_batch: int = 64) -> None:
+        if kind == "thread":
+            self.pool = concurrent.futures.ThreadPoolExecutor(workers)
+        elif kind == "process":
+            self.pool = concurrent.futures.ProcessPoolExecutor(workers)
+        else:
+            raise ValueError(f"Executor kind must be 'thread' or 'process', not {kind!r}.")
+
+        self.workers = workers
+        self.kind = kind
+        self.max_pending = max_pending
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.__queue = None
+        self.__slots = None
+        self.__dispatcher = None
+        self.__tasks = set()
+        self.__closed = False
+
+    async def __aenter__(self) -> "Executor":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def run(self, circuit: quantum.Circuit, shots: int = 1024, state: str | int | None = None, timeout: float | None = None, seed: int | None = None) -> dict[str, int]:
+        """
+        Simulate a circuit and sample measurement counts without blocking the event loop.
+
+        Args:
+            circuit (quantum.Circuit): The circuit to run. Its instructions are copied on submission.
+            shots (int): Number of measurement samples.
+            state (str | int | None): Initial basis state, all zeros by default.
+            timeout (float | None): Seconds to wait for the result, including time spent queued.
+            seed (int | None): Seed for this job's sampling.
+
+        Returns:
+            dict[str, int]: Counts of each observed bitstring.
+
+        Raises:
+            asyncio.TimeoutError: If the job does not finish within `timeout`.
+        """
+        if self.__closed:
+            raise RuntimeError("Executor is closed.")
+        if self.__dispatcher is None:
+            self.__queue = asyncio.Queue(self.max_pending)
+            self.__slots = asyncio.Semaphore(self.workers)
+            self.__dispatcher = asyncio.get_running_loop().create_task(self.__dispatch())
+
+        future = asyncio.get_running_loop().create_future()
+        job = _Job(circuit, "0" * circuit.qubits if state is None else state, shots, seed, future)
+        return await asyncio.wait_for(self.__submit(job), timeout)
+
+    async def __submit(self, job: _Job) -> dict[str, int]:
+        await self.__queue.put(job)
+        return await job.future
+
+    async def __dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            jobs = [await self.__queue.get()]
+            if self.batch_window > 0:
+                await asyncio.sleep(self.batch_window)
+            while len(jobs) < self.max_batch and not self.__queue.empty():
+                jobs.append(self.__queue.get_nowait())
+
+            batches = {}
+            for job in jobs:
+                if not job.future.done():
+                    batches.setdefault(job.key, []).append(job)
+            for batch in batches.values():
+                await self.__slots.acquire()
+                task = loop.create_task(self.__execute(batch))
+                self.__tasks.add(task)
+                task.add_done_callback(self.__tasks.discard)
+            for _ in jobs:
+                self.__queue.task_done()
+
+    async def __execute(self, batch: list[_Job]) -> None:
+        first = batch[0]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.pool, _simulate, first.qubits, first.device, first.instructions, first.state,
+                [job.shots for job in batch], [job.seed for job in batch],
+            )
+        except Exception as error:
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(error)
+        else:
+            for job, result in zip(batch, results):
+                if not job.future.done():
+                    job.future.set_result(result)
+        finally:
+            self.__slots.release()
+
+    async def close(self) -> None:
+        """
+        Stop accepting jobs, wait for queued jobs to be dispatched, and shut down the pool.
+        """
+        self.__closed = True
+        if self.__dispatcher is not None:
+            await self.__queue.join()
+            for _ in range(self.workers):
+                await self.__slots.acquire()
+            self.__dispatcher.cancel()
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -1,5 +1,8 @@
 import numpy as np
 
+from . import exceptions
+from .sparse import CSR
+
 GATES = {
     "cpu": {
         "HADAMARD": np.array([[1, 1], 
@@ -54,6 +57,24 @@ GATES = {
     },
 }
 
+def rx(theta: float) -> np.ndarray:
+    return np.array([[np.cos(theta / 2), -1j * np.sin(theta / 2)],
+                     [-1j * np.sin(theta / 2), np.cos(theta / 2)]], dtype=complex)
+
+def ry(theta: float) -> np.ndarray:
+    return np.array([[np.cos(theta / 2), -np.sin(theta / 2)],
+                     [np.sin(theta / 2), np.cos(theta / 2)]], dtype=complex)
+
+def rz(theta: float) -> np.ndarray:
+    return np.array([[np.exp(-1j * theta / 2), 0],
+                     [0, np.exp(1j * theta / 2)]], dtype=complex)
+
+ROTATIONS = {
+    "RX": rx,
+    "RY": ry,
+    "RZ": rz,
+}
+
 def wrap_in_controls_upwards(gate: np.ndarray) -> np.ndarray:
     identity = np.eye(gate.shape[0], dtype=complex)
     top = np.kron(np.array([[1, 0], [0, 0]], dtype=complex), identity)
@@ -67,24 +88,39 @@ def wrap_in_controls_downwards(gate: np.ndarray) -> np.ndarray:
     return top + bottom
 
 
-# TODO: Implement the controlled_gate function
-def controlled_gate(qubits: int, gate: np.ndarray, target: int, *controls: int) -> np.ndarray:
-    identity = np.eye(2, dtype=complex)
-    applied_gate = gate
-    controls = sorted(list(controls))
-    print(controls)
-
-    for qubit in range(controls[0], target):
-        print(qubit)
-        if qubit not in controls:
-            applied_gate = np.kron(applied_gate, identity)
-        else:
-            applied_gate = wrap_in_controls_downwards(applied_gate)
-    
-    for i in range(0, controls[0]):
-        applied_gate = np.kron(identity, applied_gate)
-    
-    for i in range(target+1, qubits):
-        applied_gate = np.kron(applied_gate, identity)
-    
-    return applied_gate
\ No newline at end of file
+def controlled_gate(qubits: int, gate: np.ndarray, target: int, *controls: int, sparse: bool = False) -> np.ndarray | CSR:
+    """
+    The 2^qubits x 2^qubits matrix applying a single-qubit gate to `target`
+    when every control qubit is 1, built by index arithmetic.
+
+    Args:
+        qubits (int): The number of qubits.
+        gate (np.ndarray): The (2, 2) gate.
+        target (int): The target qubit.
+        *controls (int): The control qubits, in any order.
+        sparse (bool): Return a `sparse.CSR` with at most two non-zeros per row
+            instead of a dense matrix.
+
+    Returns:
+        np.ndarray | CSR: The controlled gate.
+    """
+    for qubit in (target, *controls):
+        if qubit < 0 or qubit >= qubits:
+            raise exceptions.StateError(str(qubit))
+    if len(set((target, *controls))) != len(controls) + 1:
+        raise exceptions.StateError(str((target, *controls)))
+
+    gate = np.asarray(gate, dtype=complex)
+    rows = np.arange(2 ** qubits, dtype=np.int64)
+    mask = sum(1 << (qubits - 1 - control) for control in controls)
+    bit = 1 << (qubits - 1 - target)
+    active = rows[rows & mask == mask]
+    idle = rows[rows & mask != mask]
+    local = ((active & bit) > 0).astype(int)
+
+    rows = np.concatenate([idle, active, active])
+    columns = np.concatenate([idle, active & ~bit, active | bit])
+    values = np.concatenate([np.ones(len(idle), dtype=complex), gate[local, 0], gate[local, 1]])
+    keep = values != 0
+    operator = CSR.from_coo(rows[keep], columns[keep], values[keep], (2 ** qubits, 2 ** qubits))
+    return operator if sparse else operator.to_dense()
\ No newline at end of file
@@ -0,0 +1,247 @@
+import numpy as np
+
+from . import ir
+from . import quantum
+
+SINGLE = np.array([ir.OPCODE[name] for name in ("HADAMARD", "PAULI_X", "PAULI_Y", "PAULI_Z", "RX", "RY", "RZ")], dtype=np.uint8)
+
+DOUBLE = np.array([ir.OPCODE[name] for name in ("CNOT", "CY", "CZ", "SWAP")], dtype=np.uint8)
+
+ROTATIONS = np.array([ir.OPCODE[name] for name in ("RX", "RY", "RZ")], dtype=np.uint8)
+
+# A random two-qubit block in the style of quantum volume: a rotation layer on
+# both qubits, three alternating CNOTs with rotations between them, and a final
+# rotation layer. The first six slots alone form the non-entangling variant.
+VOLUME = (
+    ("RZ", (0,)), ("RY", (0,)), ("RZ", (0,)),
+    ("RZ", (1,)), ("RY", (1,)), ("RZ", (1,)),
+    ("CNOT", (0, 1)), ("RY", (0,)), ("RZ", (1,)),
+    ("CNOT", (1, 0)), ("RY", (0,)),
+    ("CNOT", (0, 1)),
+    ("RZ", (0,)), ("RY", (0,)), ("RZ", (0,)),
+    ("RZ", (1,)), ("RY", (1,)), ("RZ", (1,)),
+)
+
+def _instantiate(template: tuple | list, roles: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Stamp a gate template onto many blocks at once.
+
+    Args:
+        template: (name, slots) pairs, where each slot indexes a column of `roles`.
+        roles: A (B, R) array giving the qubit that fills each role in each block.
+
+    Returns:
+        Opcodes (B, T), qubits (B, T, MAX_ARITY) padded with -1 and zero params (B, T).
+    """
+    slots = np.full((len(template), ir.MAX_ARITY), roles.shape[1], dtype=np.intp)
+    for position, (_, indices) in enumerate(template):
+        slots[position, :len(indices)] = indices
+    padded = np.concatenate([roles, np.full((len(roles), 1), -1, dtype=roles.dtype)], axis=1)
+    opcodes = np.broadcast_to(np.array([ir.OPCODE[name] for name, _ in template], dtype=np.uint8), (len(roles), len(template)))
+    return opcodes.copy(), padded[:, slots], np.zeros((len(roles), len(template)))
+
+def _circuit(qubits: int, device: str, opcodes: np.ndarray, targets: np.ndarray, params: np.ndarray, keep: np.ndarray | None = None) -> quantum.Circuit:
+    if keep is not None:
+        opcodes, targets, params = opcodes[keep], targets[keep], params[keep]
+    circuit = quantum.Circuit(qubits, device)
+    circuit.instructions = ir.Instructions.from_arrays(opcodes.reshape(-1), targets.reshape(-1, ir.MAX_ARITY), params.reshape(-1))
+    return circuit
+
+def _pack(gates: list[tuple[str, tuple[int, ...], float]]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    opcodes = np.array([ir.OPCODE[name] for name, _, _ in gates], dtype=np.uint8)
+    targets = np.full((len(gates), ir.MAX_ARITY), -1, dtype=np.int32)
+    for position, (_, qubits, _) in enumerate(gates):
+        targets[position, :len(qubits)] = qubits
+    return opcodes, targets, np.array([param for _, _, param in gates], dtype=float)
+
+def _repeat(qubits: int, device: str, gates: list[tuple[str, tuple[int, ...], float]], depth: int, prefix: list | None = None) -> quantum.Circuit:
+    opcodes, targets, params = _pack(gates)
+    opcodes, targets, params = np.tile(opcodes, depth), np.tile(targets, (depth, 1)), np.tile(params, depth)
+    if prefix:
+        head = _pack(prefix)
+        opcodes, targets, params = np.concatenate([head[0], opcodes]), np.concatenate([head[1], targets]), np.concatenate([head[2], params])
+    return _circuit(qubits, device, opcodes, targets, params)
+
+def _pairs(rng: np.random.Generator, qubits: int, depth: int) -> np.ndarray:
+    # A random perfect matching per layer. With an odd qubit count one partner is
+    # the sentinel `qubits`, whose slots the callers drop.
+    width = qubits + qubits % 2
+    return rng.random((depth, width)).argsort(axis=1).reshape(-1, 2)
+
+def _mcx(controls: int) -> list[tuple[str, tuple[int, ...]]]:
+    """
+    An X on role `controls` controlled by roles 0..controls-1, as a Toffoli
+    ladder through `controls - 2` ancillas in roles controls+1 onwards that are
+    returned to |0>.
+    """
+    if controls == 1:
+        return [("CNOT", (0, 1))]
+    if controls == 2:
+        return [("TOFFOLI", (0, 1, 2))]
+    ancillas = list(range(controls + 1, 2 * controls - 1))
+    compute = [("TOFFOLI", (0, 1, ancillas[0]))]
+    compute += [("TOFFOLI", (i + 2, ancillas[i], ancillas[i + 1])) for i in range(controls - 3)]
+    return compute + [("TOFFOLI", (controls - 1, ancillas[-1], controls))] + compute[::-1]
+
+def _mcz(qubits: list[int], ancillas: list[int]) -> list[tuple[str, tuple[int, ...], float]]:
+    if len(qubits) == 1:
+        return [("PAULI_Z", (qubits[0],), 0.0)]
+    if len(qubits) == 2:
+        return [("CZ", tuple(qubits), 0.0)]
+    roles = qubits + ancillas
+    ladder = [(name, tuple(roles[role] for role in slots), 0.0) for name, slots in _mcx(len(qubits) - 1)]
+    return [("HADAMARD", (qubits[-1],), 0.0)] + ladder + [("HADAMARD", (qubits[-1],), 0.0)]
+
+def random_layered(qubits: int, depth: int, density: float = 0.5, seed: int | None = None, device: str = "cpu") -> quantum.Circuit:
+    """
+    Generate layers of random gates on disjoint qubits.
+
+    Each layer pairs the qubits at random. A pair gets a random two-qubit gate
+    (CNOT, CY, CZ or SWAP) with probability `density`, and otherwise a random
+    single-qubit gate on each qubit, with uniform angles for rotations.
+
+    Args:
+        qubits (int): The number of qubits.
+        depth (int): The number of layers.
+        density (float): The probability that a pair is entangled.
+        seed (int | None): Seed for the generator.
+        device (str): The device of the returned circuit.
+
+    Returns:
+        quantum.Circuit: The circuit.
+    """
+    rng = np.random.default_rng(seed)
+    roles = _pairs(rng, qubits, depth)
+    opcodes, targets, params = _instantiate([("CNOT", (0, 1)), ("HADAMARD", (0,)), ("HADAMARD", (1,))], roles)
+    opcodes[:, 0] = rng.choice(DOUBLE, size=len(roles))
+    opcodes[:, 1:] = rng.choice(SINGLE, size=(len(roles), 2))
+    params[:, 1:] = np.where(np.isin(opcodes[:, 1:], ROTATIONS), rng.uniform(0, 2 * np.pi, size=(len(roles), 2)), 0.0)
+
+    valid = roles < qubits
+    entangled = (rng.random(len(roles)) < density) & valid.all(axis=1)
+    keep = np.column_stack([entangled, ~entangled & valid[:, 0], ~entangled & valid[:, 1]])
+    return _circuit(qubits, device, opcodes, targets, params, keep)
+
+def quantum_volume(qubits: int, depth: int | None = None, density: float = 1.0, seed: int | None = None, device: str = "cpu") -> quantum.Circuit:
+    """
+    Generate a quantum-volume style circuit: `depth` layers (`qubits` by default)
+    of random pairings, each pair getting a random two-qubit block built from
+    three CNOTs and Euler rotations.
+
+    Args:
+        density (float): The probability that a pair gets the entangling block
+            rather than only its leading rotations.
+    """
+    rng = np.random.default_rng(seed)
+    depth = qubits if depth is None else depth
+    roles = _pairs(rng, qubits, depth)
+    opcodes, targets, params = _instantiate(VOLUME, roles)
+    params[:] = rng.uniform(0, 2 * np.pi, size=params.shape) * np.isin(opcodes, ROTATIONS)
+
+    entangled = (rng.random(len(roles)) < density) & (roles < qubits).all(axis=1)
+    keep = ((targets < qubits) & (targets >= 0)).sum(axis=2) == ir.ARITY[opcodes]
+    keep &= entangled[:, None] | (np.arange(len(VOLUME)) < 6)
+    return _circuit(qubits, device, opcodes, targets, params, keep)
+
+def qft(qubits: int, depth: int = 1, density: float = 1.0, device: str = "cpu") -> quantum.Circuit:
+    """
+    Generate the quantum Fourier transform, repeated `depth` times.
+
+    Controlled phases are built from RZ and CNOT, which matches the exact
+    transform up to a global phase. Lowering `density` gives the approximate
+    QFT, keeping only controlled phases between qubits at most
+    ceil(density * (qubits - 1)) apart.
+    """
+    cutoff = max(1, int(np.ceil(density * (qubits - 1))))
+    target, control = np.triu_indices(qubits, 1)
+    near = control - target <= cutoff
+    target, control = target[near], control[near]
+    theta = np.pi / 2.0 ** (control - target)
+
+    # CP(θ) = RZ_c(θ/2) · CNOT · RZ_t(-θ/2) · CNOT · RZ_t(θ/2), up to global phase.
+    template = [("RZ", (1,)), ("CNOT", (1, 0)), ("RZ", (0,)), ("CNOT", (1, 0)), ("RZ", (0,))]
+    opcodes, targets, params = _instantiate(template, np.column_stack([target, control]))
+    params[:] = theta[:, None] * np.array([0.5, 0, -0.5, 0, 0.5])
+
+    hadamards = _instantiate([("HADAMARD", (0,))], np.arange(qubits)[:, None])
+    opcodes = np.concatenate([hadamards[0].ravel(), opcodes.ravel()])
+    targets = np.concatenate([hadamards[1].reshape(-1, ir.MAX_ARITY), targets.reshape(-1, ir.MAX_ARITY)])
+    params = np.concatenate([hadamards[2].ravel(), params.ravel()])
+    # Order by target qubit, then Hadamard before that qubit's phases, then control, then slot.
+    first = np.concatenate([np.arange(qubits), np.repeat(target, len(template))])
+    second = np.concatenate([np.full(qubits, -1), np.repeat(control, len(template))])
+    third = np.concatenate([np.zeros(qubits, dtype=int), np.tile(np.arange(len(template)), len(target))])
+    order = np.lexsort((third, second, first))
+
+    swaps = _instantiate([("SWAP", (0, 1))], np.column_stack([np.arange(qubits // 2), qubits - 1 - np.arange(qubits // 2)]))
+    opcodes = np.concatenate([opcodes[order], swaps[0].ravel()])
+    targets = np.concatenate([targets[order], swaps[1].reshape(-1, ir.MAX_ARITY)])
+    params = np.concatenate([params[order], swaps[2].ravel()])
+    return _circuit(qubits, device, np.tile(opcodes, depth), np.tile(targets, (depth, 1)), np.tile(params, depth))
+
+def ghz(qubits: int, depth: int = 1, density: float = 1.0, device: str = "cpu") -> quantum.Circuit:
+    """
+    Generate a GHZ ladder, a Hadamard and a chain of CNOTs, repeated `depth`
+    times. `density` is the fraction of qubits the ladder spans.
+    """
+    span = min(qubits, max(2, round(density * qubits)))
+    ladder = [("HADAMARD", (0,), 0.0)] + [("CNOT", (qubit, qubit + 1), 0.0) for qubit in range(span - 1)]
+    return _repeat(qubits, device, ladder, depth)
+
+def grover(qubits: int, depth: int | None = None, density: float = 1.0, marked: int | None = None, seed: int | None = None, device: str = "cpu") -> quantum.Circuit:
+    """
+    Generate Grover search over `qubits` search qubits, plus max(0, qubits - 3)
+    ancillas for the Toffoli ladders, which start and end in |0>.
+
+    Args:
+        qubits (int): The number of search qubits.
+        depth (int | None): The number of iterations, by default the optimal count.
+        density (float): The fraction of search qubits the oracle tests, so that
+            2^(qubits - tested) states are marked.
+        marked (int | None): The marked basis state, random by default.
+        seed (int | None): Seed for the marked state and the tested qubits.
+
+    Returns:
+        quantum.Circuit: The circuit on qubits + max(0, qubits - 3) qubits.
+    """
+    rng = np.random.default_rng(seed)
+    marked = int(rng.integers(2 ** qubits)) if marked is None else marked
+    tested = sorted(rng.permutation(qubits)[:min(qubits, max(1, round(density * qubits)))].tolist())
+    depth = max(1, int(np.pi / 4 * np.sqrt(2 ** len(tested)))) if depth is None else depth
+    ancillas = list(range(qubits, qubits + max(0, qubits - 3)))
+    bits = [(marked >> (qubits - 1 - qubit)) & 1 for qubit in range(qubits)]
+
+    flips = [("PAULI_X", (qubit,), 0.0) for qubit in tested if not bits[qubit]]
+    everything = [("HADAMARD", (qubit,), 0.0) for qubit in range(qubits)]
+    nots = [("PAULI_X", (qubit,), 0.0) for qubit in range(qubits)]
+    iteration = flips + _mcz(tested, ancillas) + flips
+    iteration += everything + nots + _mcz(list(range(qubits)), ancillas) + nots + everything
+    return _repeat(qubits + len(ancillas), device, iteration, depth, prefix=everything)
+
+def oracles(qubits: int, depth: int, density: float = 0.5, seed: int | None = None, device: str = "cpu") -> quantum.Circuit:
+    """
+    Generate a family of `depth` random multi-controlled X oracles, each a
+    Toffoli ladder with random control qubits, target and control polarities.
+
+    With c controls each oracle needs c - 2 ancillas, which take the highest
+    qubit indices, so at most (qubits + 1) // 2 controls fit.
+
+    Args:
+        qubits (int): The total number of qubits, ancillas included.
+        depth (int): The number of oracles.
+        density (float): The number of controls as a fraction of the maximum.
+    """
+    rng = np.random.default_rng(seed)
+    most = max(1, min(qubits - 1, (qubits + 1) // 2))
+    controls = max(1, min(most, round(density * most)))
+    data = qubits - max(0, controls - 2)
+
+    roles = rng.random((depth, data)).argsort(axis=1)[:, :controls + 1]
+    roles = np.concatenate([roles, np.broadcast_to(np.arange(data, qubits), (depth, qubits - data))], axis=1)
+    flips = [("PAULI_X", (control,)) for control in range(controls)]
+    template = flips + _mcx(controls) + flips
+    opcodes, targets, params = _instantiate(template, roles)
+
+    negated = rng.random((depth, controls)) < 0.5
+    keep = np.concatenate([negated, np.ones((depth, len(template) - 2 * controls), dtype=bool), negated], axis=1)
+    return _circuit(qubits, device, opcodes, targets, params, keep)
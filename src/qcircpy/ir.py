@@ -0,0 +1,118 @@
+import numpy as np
+
+from . import backends
+from . import gates
+
+OPCODES = (
+    "HADAMARD",
+    "PAULI_X",
+    "PAULI_Y",
+    "PAULI_Z",
+    "CNOT",
+    "SWAP",
+    "TOFFOLI",
+    "CSWAP",
+    "CY",
+    "CZ",
+    "RX",
+    "RY",
+    "RZ",
+    "MEASURE",
+)
+
+OPCODE = {name: opcode for opcode, name in enumerate(OPCODES)}
+
+ARITY = np.array([1, 1, 1, 1, 2, 2, 3, 3, 2, 2, 1, 1, 1, 1], dtype=np.int8)
+
+MAX_ARITY = 3
+
+INSTRUCTION = np.dtype([
+    ("opcode", np.uint8),
+    ("qubits", np.int32, (MAX_ARITY,)),
+    ("param", np.float64),
+])
+
+# Measurements are recorded in the instruction list but are not unitary; their
+# param holds the index of the classical bit receiving the outcome.
+MEASURE = OPCODE["MEASURE"]
+
+def matrix(opcode: int, param: float = 0.0, device: str = "cpu") -> np.ndarray:
+    name = OPCODES[opcode]
+    if opcode == MEASURE:
+        raise ValueError("MEASURE has no matrix.")
+    if name in gates.ROTATIONS:
+        return gates.ROTATIONS[name](param)
+    return backends.get(device).gates[name]
+
+
+class Instructions:
+    """
+    A growable, contiguous array of gate instructions.
+
+    Each record holds an opcode (an index into `OPCODES`), up to `MAX_ARITY`
+    qubit indices padded with -1, and a single float parameter used by the
+    rotation gates. No per-gate matrices are stored.
+
+    Attributes:
+        array (np.ndarray): A view of the used part of the buffer, with dtype `INSTRUCTION`.
+    """
+
+    def __init__(self, capacity: int = 16) -> None:
+        self.__data = np.empty(max(capacity, 1), dtype=INSTRUCTION)
+        self.__size = 0
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> "Instructions":
+        instructions = cls(len(array))
+        instructions.extend(array)
+        return instructions
+
+    @classmethod
+    def from_arrays(cls, opcodes: np.ndarray, qubits: np.ndarray, params: np.ndarray | None = None) -> "Instructions":
+        instructions = cls(len(opcodes))
+        data = instructions.__data[:len(opcodes)]
+        data["opcode"] = opcodes
+        data["qubits"] = -1
+        data["qubits"][:, :qubits.shape[1]] = qubits
+        data["param"] = 0.0 if params is None else params
+        instructions.__size = len(opcodes)
+        return instructions
+
+    @property
+    def array(self) -> np.ndarray:
+        return self.__data[:self.__size]
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __iter__(self):
+        array = self.array
+        arity = ARITY[array["opcode"]].tolist()
+        for opcode, qubits, param, width in zip(array["opcode"].tolist(), array["qubits"].tolist(), array["param"].tolist(), arity):
+            yield opcode, tuple(qubits[:width]), param
+
+    def __reserve(self, size: int) -> None:
+        if size > len(self.__data):
+            data = np.empty(max(size, 2 * len(self.__data)), dtype=INSTRUCTION)
+            data[:self.__size] = self.__data[:self.__size]
+            self.__data = data
+
+    def append(self, opcode: int, qubits: tuple[int, ...], param: float = 0.0) -> None:
+        self.__reserve(self.__size + 1)
+        self.__data[self.__size] = (opcode, tuple(qubits) + (-1,) * (MAX_ARITY - len(qubits)), param)
+        self.__size += 1
+
+    def extend(self, array: np.ndarray) -> None:
+        self.__reserve(self.__size + len(array))
+        self.__data[self.__size:self.__size + len(array)] = array
+        self.__size += len(array)
+
+    def keep(self, mask: np.ndarray) -> int:
+        kept = self.array[mask]
+        self.__data[:len(kept)] = kept
+        removed = self.__size - len(kept)
+        self.__size = len(kept)
+        return removed
+
+    def copy(self) -> "Instructions":
+        return Instructions.from_array(self.array)
@@ -0,0 +1,42 @@
+import numpy as np
+
+def apply(state: np.ndarray, gate: np.ndarray, qubits: tuple[int, ...] | list[int]) -> np.ndarray:
+    """
+    Apply a k-qubit gate to the given qubits of a state without expanding it.
+
+    The state is viewed as a tensor with one axis of length 2 per qubit (qubit 0
+    is the most significant) followed by any trailing batch axes, so a (2^n, 1)
+    column and a (2^n, m) block of columns are both accepted. The cost is
+    O(2^n * 2^k) per column instead of O(4^n) for the expanded matrix.
+
+    Args:
+        state (np.ndarray): The state, of shape (2^n,) or (2^n, m).
+        gate (np.ndarray): The (2^k, 2^k) gate matrix.
+        qubits: The k qubits the gate acts on, in the gate's own qubit order.
+
+    Returns:
+        np.ndarray: A new array with the same shape as `state`.
+    """
+    qubits = tuple(qubits)
+    width = len(qubits)
+    if qubits == tuple(range(qubits[0], qubits[0] + width)):
+        # Adjacent ascending qubits form one axis of length 2^k, so a single
+        # broadcast matmul produces the output without any transposes.
+        tensor = state.reshape(2 ** qubits[0], 2 ** width, -1)
+        if tensor.shape[2] >= 32:
+            return np.matmul(gate, tensor).reshape(state.shape)
+        # On the least significant qubits the broadcast matmul degenerates into
+        # many tiny products, so fold everything else into one GEMM instead.
+        rest = tensor.shape[2]
+        output = tensor.transpose(0, 2, 1).reshape(-1, 2 ** width) @ gate.T
+        output = output.reshape(2 ** qubits[0], rest, 2 ** width).transpose(0, 2, 1)
+        return np.ascontiguousarray(output).reshape(state.shape)
+
+    size = state.shape[0].bit_length() - 1
+    tensor = state.reshape((2,) * size + state.shape[1:])
+    tensor = np.tensordot(gate.reshape((2,) * (2 * width)), tensor, axes=(tuple(range(width, 2 * width)), qubits))
+    tensor = np.moveaxis(tensor, tuple(range(width)), qubits)
+    return np.ascontiguousarray(tensor).reshape(state.shape)
+
+def expand(gate: np.ndarray, qubits: tuple[int, ...] | list[int], size: int) -> np.ndarray:
+    return apply(np.identity(2 ** size, dtype=complex), gate, qubits)
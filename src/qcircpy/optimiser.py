@@ -0,0 +1,230 @@
+import math
+
+import numpy as np
+
+from . import ir
+from . import quantum
+
+SELF_INVERSE = frozenset(ir.OPCODE[name] for name in (
+    "HADAMARD", "PAULI_X", "PAULI_Y", "PAULI_Z", "CNOT", "SWAP", "TOFFOLI", "CSWAP", "CY", "CZ",
+))
+
+ROTATIONS = frozenset(ir.OPCODE[name] for name in ("RX", "RY", "RZ"))
+
+# The basis in which each gate is block diagonal on each of its qubits: "Z" for
+# controls and diagonal gates, "X" for bit flips and their rotations, None when
+# the gate mixes both. Two gates commute when they agree on every shared qubit.
+BASES = {
+    ir.OPCODE["HADAMARD"]: (None,),
+    ir.OPCODE["PAULI_X"]: ("X",),
+    ir.OPCODE["PAULI_Y"]: (None,),
+    ir.OPCODE["PAULI_Z"]: ("Z",),
+    ir.OPCODE["CNOT"]: ("Z", "X"),
+    ir.OPCODE["SWAP"]: (None, None),
+    ir.OPCODE["TOFFOLI"]: ("Z", "Z", "X"),
+    ir.OPCODE["CSWAP"]: ("Z", None, None),
+    ir.OPCODE["CY"]: ("Z", None),
+    ir.OPCODE["CZ"]: ("Z", "Z"),
+    ir.OPCODE["RX"]: ("X",),
+    ir.OPCODE["RY"]: (None,),
+    ir.OPCODE["RZ"]: ("Z",),
+    ir.OPCODE["MEASURE"]: (None,),
+}
+
+# Qubit positions that can be exchanged without changing the gate.
+SYMMETRIC = {
+    ir.OPCODE["SWAP"]: (0, 1),
+    ir.OPCODE["CZ"]: (0, 1),
+    ir.OPCODE["TOFFOLI"]: (0, 1),
+    ir.OPCODE["CSWAP"]: (1, 2),
+}
+
+def canonical(opcode: int, qubits: tuple[int, ...]) -> tuple[int, ...]:
+    if opcode in SYMMETRIC:
+        first, second = SYMMETRIC[opcode]
+        if qubits[first] > qubits[second]:
+            qubits = list(qubits)
+            qubits[first], qubits[second] = qubits[second], qubits[first]
+            return tuple(qubits)
+    return qubits
+
+def commutes(opcode1: int, qubits1: tuple[int, ...], opcode2: int, qubits2: tuple[int, ...]) -> bool:
+    bases1 = dict(zip(qubits1, BASES[opcode1]))
+    for qubit, basis in zip(qubits2, BASES[opcode2]):
+        if qubit in bases1 and (basis is None or bases1[qubit] != basis):
+            return False
+    return True
+
+
+class _Sweep:
+    """
+    Single forward pass over an instruction list that pairs each gate with an
+    earlier gate on the same qubits, optionally looking past gates it commutes with.
+    """
+
+    def __init__(self, circuit: quantum.Circuit, through: bool, window: int) -> None:
+        self.circuit = circuit
+        self.through = through
+        self.window = window
+        self.opcodes = []
+        self.qubits = []
+        self.params = []
+        for opcode, qubits, param in circuit.instructions:
+            self.opcodes.append(opcode)
+            self.qubits.append(canonical(opcode, qubits))
+            self.params.append(param)
+        self.removed = np.zeros(len(self.opcodes), dtype=bool)
+        self.lines = [[] for _ in range(circuit.qubits)]
+
+    def commutes(self, first: int, second: int) -> bool:
+        return commutes(self.opcodes[first], self.qubits[first], self.opcodes[second], self.qubits[second])
+
+    def partner(self, index: int, matches) -> int | None:
+        qubits = self.qubits[index]
+        line = self.lines[qubits[0]]
+        for depth, candidate in enumerate(reversed(line)):
+            if depth >= self.window:
+                return None
+            if matches(candidate, index):
+                for qubit in qubits[1:]:
+                    for between in reversed(self.lines[qubit]):
+                        if between <= candidate:
+                            break
+                        if not self.through or not self.commutes(between, index):
+                            return None
+                return candidate
+            if not self.through or not self.commutes(candidate, index):
+                return None
+        return None
+
+    def push(self, index: int) -> None:
+        for qubit in self.qubits[index]:
+            self.lines[qubit].append(index)
+
+    def remove(self, index: int) -> None:
+        self.removed[index] = True
+        for qubit in self.qubits[index]:
+            self.lines[qubit].remove(index)
+
+    def finish(self) -> int:
+        instructions = self.circuit.instructions
+        instructions.array["param"] = self.params
+        return instructions.keep(~self.removed)
+
+
+def _cancel(circuit: quantum.Circuit, through: bool, window: int) -> int:
+    sweep = _Sweep(circuit, through, window)
+
+    def matches(candidate: int, index: int) -> bool:
+        return (sweep.opcodes[candidate] == sweep.opcodes[index]
+                and sweep.qubits[candidate] == sweep.qubits[index]
+                and sweep.opcodes[index] in SELF_INVERSE)
+
+    for index in range(len(sweep.opcodes)):
+        candidate = sweep.partner(index, matches)
+        if candidate is None:
+            sweep.push(index)
+        else:
+            sweep.remove(candidate)
+            sweep.removed[index] = True
+    return sweep.finish()
+
+def cancel_inverses(circuit: quantum.Circuit, **_) -> int:
+    """
+    Remove pairs of identical self-inverse gates (H·H, X·X, CNOT·CNOT, SWAP·SWAP, ...)
+    with no other gate on their qubits in between.
+
+    Args:
+        circuit (quantum.Circuit): The circuit, modified in place.
+
+    Returns:
+        int: The number of gates removed.
+    """
+    return _cancel(circuit, False, 1)
+
+def cancel_commuting(circuit: quantum.Circuit, window: int = 64) -> int:
+    """
+    Remove pairs of identical self-inverse gates separated only by gates that
+    commute with them, such as diagonal gates or controls sharing a qubit.
+
+    Args:
+        circuit (quantum.Circuit): The circuit, modified in place.
+        window (int): How many earlier gates on a qubit to look past.
+
+    Returns:
+        int: The number of gates removed.
+    """
+    return _cancel(circuit, True, window)
+
+def merge_rotations(circuit: quantum.Circuit, window: int = 64) -> int:
+    """
+    Merge consecutive rotations about the same axis on the same qubit, looking
+    past commuting gates, and drop rotations whose angle is a multiple of 4π.
+
+    Args:
+        circuit (quantum.Circuit): The circuit, modified in place.
+        window (int): How many earlier gates on a qubit to look past.
+
+    Returns:
+        int: The number of gates removed.
+    """
+    sweep = _Sweep(circuit, True, window)
+
+    def matches(candidate: int, index: int) -> bool:
+        return (sweep.opcodes[candidate] == sweep.opcodes[index]
+                and sweep.qubits[candidate] == sweep.qubits[index])
+
+    for index, opcode in enumerate(sweep.opcodes):
+        if opcode not in ROTATIONS:
+            sweep.push(index)
+            continue
+
+        candidate = sweep.partner(index, matches)
+        if candidate is None:
+            target = index
+            sweep.push(index)
+        else:
+            target = candidate
+            sweep.params[candidate] += sweep.params[index]
+            sweep.removed[index] = True
+
+        if abs(math.remainder(sweep.params[target], 4 * math.pi)) < 1e-12:
+            sweep.remove(target)
+    return sweep.finish()
+
+# Every pass takes the circuit and the `optimise` options as keywords, ignoring
+# those it does not use.
+PASSES = {
+    "cancel_inverses": cancel_inverses,
+    "cancel_commuting": cancel_commuting,
+    "merge_rotations": merge_rotations,
+}
+
+DEFAULT_PASSES = ("cancel_inverses", "cancel_commuting", "merge_rotations")
+
+def optimise(circuit: quantum.Circuit, passes: tuple[str, ...] = DEFAULT_PASSES, window: int = 64, repeat: bool = True) -> dict[str, int]:
+    """
+    Run peephole passes over a circuit's instructions, in place.
+
+    Args:
+        circuit (quantum.Circuit): The circuit to optimise.
+        passes: Names of passes from `PASSES`, run in order.
+        window (int): How many earlier gates on a qubit the commutation-aware passes look past.
+        repeat (bool): Rerun the passes until none of them removes a gate.
+
+    Returns:
+        dict[str, int]: The number of gates removed by each pass.
+    """
+    for name in passes:
+        if name not in PASSES:
+            raise ValueError(f"Unknown optimisation pass {name!r}.")
+
+    removed = {name: 0 for name in passes}
+    while True:
+        total = 0
+        for name in passes:
+            count = PASSES[name](circuit, window=window)
+            removed[name] += count
+            total += count
+        if not repeat or total == 0:
+            return removed
@@ -0,0 +1,239 @@
+import os
+import time
+import typing
+
+import numpy as np
+
+from . import exceptions
+from . import gates
+from . import generators
+from . import ir
+from . import kernels
+from . import quantum
+from . import tensornet
+
+BACKENDS = ("dense", "kernel", "tensornet")
+
+AMPLITUDE = np.dtype(complex).itemsize
+
+_CALIBRATION = {}
+
+def _fastest(function: typing.Callable[[], object], repeats: int) -> float:
+    function()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def calibrate(qubits: int = 16, repeats: int = 3) -> dict[str, float]:
+    """
+    Measure this machine's effective state-pass bandwidth, complex matmul
+    throughput and per-call overheads with a quick microbenchmark.
+    The result is cached per process.
+
+    Returns:
+        dict[str, float]: "bandwidth" in bytes per second moved by the kernel,
+        "flops" in real floating point operations per second, and the fixed
+        seconds per kernel call ("gate") and per contraction step, planning
+        included ("step").
+    """
+    if not _CALIBRATION:
+        state = np.zeros((2 ** qubits, 1), dtype=complex)
+        state[0] = 1
+        hadamard = gates.GATES["cpu"]["HADAMARD"]
+        # Warm passes on qubits spread across the register, as the speed of a
+        # pass depends on the stride of the qubit it acts on.
+        positions = range(0, qubits, max(1, qubits // 4))
+        elapsed = max(sum(_fastest(lambda: kernels.apply(state, hadamard, (qubit,)), repeats) for qubit in positions), 1e-9)
+        _CALIBRATION["bandwidth"] = 2 * len(positions) * state.nbytes / elapsed
+
+        matrix = np.ones((256, 256), dtype=complex)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            matrix @ matrix
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        _CALIBRATION["flops"] = repeats * 8 * 256 ** 3 / elapsed
+
+        # On a small circuit the time is dominated by the fixed Python work of
+        # each kernel call and each contraction step, which the bandwidth and
+        # flop terms do not cover.
+        circuit = generators.random_layered(6, 4, seed=0)
+        network = tensornet.TensorNetwork(circuit)
+        steps = len(network.plan(qubits=[0, 1]).path)
+        count = int(np.count_nonzero(circuit.instructions.array["opcode"] != ir.MEASURE))
+        _CALIBRATION["gate"] = _fastest(lambda: circuit(0), repeats) / count
+        _CALIBRATION["step"] = _fastest(lambda: network.marginal([0, 1]), repeats) / steps
+    return dict(_CALIBRATION)
+
+def available_memory() -> int | None:
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+class Estimate:
+    """
+    Estimated resources for running a circuit on one backend.
+
+    Attributes:
+        backend (str): The backend name.
+        memory (int): Peak memory in bytes.
+        passes (int): Number of full sweeps over the state vector (or over
+            intermediate tensors, for tensor networks).
+        flops (int): Real floating point operations.
+        seconds (float): Expected wall time on this machine.
+    """
+
+    def __init__(self, backend: str, memory: int, passes: int, flops: int, moved: int, calibration: dict[str, float], overhead: float = 0.0) -> None:
+        self.backend = backend
+        self.memory = memory
+        self.passes = passes
+        self.flops = flops
+        self.seconds = moved / calibration["bandwidth"] + flops / calibration["flops"] + overhead
+
+    def __repr__(self) -> str:
+        return f"Estimate({self.backend}: memory={self.memory} bytes, passes={self.passes}, flops={self.flops:.3e}, seconds={self.seconds:.3g})"
+
+
+class Plan:
+    """
+    Resource estimates for every applicable backend and the one chosen to run.
+
+    Attributes:
+        backend (str): The chosen backend.
+        estimates (dict[str, Estimate]): Estimates keyed by backend name.
+        budget (int | None): The memory budget in bytes the choice was made against.
+        qubits (list[int]): The qubits whose outcomes are produced.
+        shots (int): The number of samples, or 0 for exact probabilities.
+    """
+
+    def __init__(self, backend: str, estimates: dict[str, Estimate], budget: int | None, qubits: list[int], shots: int) -> None:
+        self.backend = backend
+        self.estimates = estimates
+        self.budget = budget
+        self.qubits = qubits
+        self.shots = shots
+
+    def __repr__(self) -> str:
+        return f"Plan(backend={self.backend!r}, estimates={list(self.estimates.values())})"
+
+
+def estimate(circuit: quantum.Circuit, qubits: list[int] | None = None, calibration: dict[str, float] | None = None) -> dict[str, Estimate]:
+    """
+    Estimate peak memory, state passes, flops and wall time of each backend.
+
+    "dense" expands every gate to a 2^n x 2^n matrix, "kernel" applies gates
+    to the state vector with `kernels.apply`, and "tensornet" contracts a
+    `tensornet.TensorNetwork` for the marginal of `qubits`, which is only
+    estimated when a subset of qubits is requested.
+    """
+    calibration = calibrate() if calibration is None else calibration
+    size = 2 ** circuit.qubits
+    array = circuit.instructions.array
+    arities = np.bincount(ir.ARITY[array["opcode"][array["opcode"] != ir.MEASURE]], minlength=ir.MAX_ARITY + 1).tolist()
+    count = sum(arities)
+
+    estimates = {}
+    estimates["dense"] = Estimate(
+        "dense",
+        memory=3 * size * size * AMPLITUDE + 2 * size * AMPLITUDE,
+        passes=count,
+        flops=count * 8 * size * size,
+        moved=count * 3 * size * size * AMPLITUDE,
+        calibration=calibration,
+    )
+    estimates["kernel"] = Estimate(
+        "kernel",
+        memory=3 * size * AMPLITUDE,
+        passes=2 * count,
+        flops=sum(8 * size * 2 ** arity * number for arity, number in enumerate(arities)),
+        moved=count * 4 * size * AMPLITUDE,
+        calibration=calibration,
+        overhead=count * calibration["gate"],
+    )
+    if qubits is not None and len(qubits) < circuit.qubits:
+        contraction = tensornet.TensorNetwork(circuit).plan(qubits=qubits)
+        estimates["tensornet"] = Estimate(
+            "tensornet",
+            memory=3 * contraction.size,
+            passes=len(contraction.path),
+            flops=8 * contraction.flops,
+            moved=contraction.moved,
+            calibration=calibration,
+            overhead=len(contraction.path) * calibration["step"],
+        )
+    return estimates
+
+def plan(circuit: quantum.Circuit, qubits: list[int] | None = None, shots: int = 0, budget: int | None = None, backend: str = "auto") -> Plan:
+    """
+    Choose how to run a circuit, refusing up front if nothing fits in memory.
+
+    Args:
+        circuit (quantum.Circuit): The circuit to run from the all-zeros state.
+        qubits: The qubits to measure, all of them by default.
+        shots (int): Number of samples, or 0 for exact probabilities.
+        budget (int | None): Memory budget in bytes, by default the available physical memory.
+        backend (str): A name from `BACKENDS`, or "auto" for the fastest one that fits.
+
+    Returns:
+        Plan: The estimates and the chosen backend.
+
+    Raises:
+        ResourceError: If the requested backend, or every backend in auto mode, exceeds the budget.
+    """
+    if backend != "auto" and backend not in BACKENDS:
+        raise exceptions.DeviceError(backend)
+    qubits = list(range(circuit.qubits)) if qubits is None else list(qubits)
+    budget = available_memory() if budget is None else budget
+    estimates = estimate(circuit, qubits)
+
+    fits = {name: value for name, value in estimates.items() if budget is None or value.memory <= budget}
+    if backend != "auto":
+        if backend not in estimates:
+            raise exceptions.ResourceError(f"backend {backend} cannot produce a marginal of all {circuit.qubits} qubits")
+        if backend not in fits:
+            raise exceptions.ResourceError(f"backend {backend} needs {estimates[backend].memory} bytes, over the {budget} byte budget")
+        return Plan(backend, estimates, budget, qubits, shots)
+
+    if not fits:
+        smallest = min(estimates.values(), key=lambda value: value.memory)
+        raise exceptions.ResourceError(f"the smallest backend ({smallest.backend}) needs {smallest.memory} bytes, over the {budget} byte budget")
+    chosen = min(fits.values(), key=lambda value: value.seconds)
+    return Plan(chosen.backend, estimates, budget, qubits, shots)
+
+def run(circuit: quantum.Circuit, qubits: list[int] | None = None, shots: int = 0, budget: int | None = None, backend: str = "auto", seed: int | None = None) -> np.ndarray | dict[str, int]:
+    """
+    Plan and run a circuit from the all-zeros state.
+
+    Returns:
+        np.ndarray | dict[str, int]: The exact marginal probabilities of `qubits`
+        if `shots` is 0, otherwise counts of sampled bitstrings.
+    """
+    chosen = plan(circuit, qubits, shots, budget, backend)
+    qubits = chosen.qubits
+    if chosen.backend == "tensornet":
+        probabilities = tensornet.TensorNetwork(circuit).marginal(qubits)
+    else:
+        if chosen.backend == "dense":
+            state = circuit.module.zeros((2 ** circuit.qubits, 1), dtype=complex)
+            state[0] = 1
+            for opcode, targets, param in circuit.instructions:
+                if opcode != ir.MEASURE:
+                    state = kernels.expand(ir.matrix(opcode, param, circuit.device), targets, circuit.qubits) @ state
+        else:
+            state = circuit(0)
+        tensor = np.abs(state.reshape((2,) * circuit.qubits)) ** 2
+        unmeasured = tuple(i for i in range(circuit.qubits) if i not in qubits)
+        if unmeasured:
+            tensor = tensor.sum(axis=unmeasured)
+        order = sorted(qubits)
+        probabilities = tensor.transpose([order.index(qubit) for qubit in qubits]).ravel()
+
+    probabilities = probabilities / probabilities.sum()
+    if not shots:
+        return probabilities
+    histogram = np.random.default_rng(seed).multinomial(shots, probabilities)
+    return {f"{index:0>{len(qubits)}b}": int(histogram[index]) for index in np.flatnonzero(histogram)}
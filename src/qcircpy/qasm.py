@@ -0,0 +1,301 @@
+import ast
+import math
+import operator
+import os
+import re
+import typing
+
+from . import exceptions
+from . import ir
+from . import quantum
+
+NAMES = {
+    "h": "HADAMARD",
+    "x": "PAULI_X",
+    "y": "PAULI_Y",
+    "z": "PAULI_Z",
+    "cx": "CNOT",
+    "CX": "CNOT",
+    "swap": "SWAP",
+    "ccx": "TOFFOLI",
+    "cswap": "CSWAP",
+    "cy": "CY",
+    "cz": "CZ",
+    "rx": "RX",
+    "ry": "RY",
+    "rz": "RZ",
+}
+
+MNEMONICS = {
+    "HADAMARD": "h",
+    "PAULI_X": "x",
+    "PAULI_Y": "y",
+    "PAULI_Z": "z",
+    "CNOT": "cx",
+    "SWAP": "swap",
+    "TOFFOLI": "ccx",
+    "CSWAP": "cswap",
+    "CY": "cy",
+    "CZ": "cz",
+    "RX": "rx",
+    "RY": "ry",
+    "RZ": "rz",
+}
+
+ARITY = ir.ARITY.tolist()
+
+PARAMETERISED = frozenset(("RX", "RY", "RZ"))
+
+REGISTER = re.compile(r"(qreg|creg)\s+([A-Za-z_]\w*)\s*\[\s*(\d+)\s*\]$")
+MEASURE = re.compile(r"measure\s+(.+?)\s*->\s*(.+)$")
+GATE = re.compile(r"([A-Za-z_]\w*)\s*(?:\((.*)\))?\s*(.+)$")
+OPERAND = re.compile(r"([A-Za-z_]\w*)\s*(?:\[\s*(\d+)\s*\])?$")
+
+OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+FUNCTIONS = {
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "exp": math.exp,
+    "ln": math.log,
+    "sqrt": math.sqrt,
+}
+
+
+class _Reader:
+    def __init__(self, device: str) -> None:
+        self.device = device
+        self.instructions = ir.Instructions()
+        self.qregs = {}
+        self.cregs = {}
+        self.qubits = 0
+        self.clbits = 0
+        self.operands = {}
+        self.expressions = {}
+        self.line = 0
+
+    def error(self, reason: str) -> exceptions.ParseError:
+        return exceptions.ParseError(self.line, reason)
+
+    def statements(self, lines: typing.Iterable[str]) -> typing.Iterator[str]:
+        pending = ""
+        for self.line, text in enumerate(lines, 1):
+            # Lines of a statement split across several lines are joined with a
+            # space so tokens either side of a line break stay apart.
+            text = pending + " " + text.split("//", 1)[0]
+            if ";" not in text:
+                pending = text
+                continue
+            parts = text.split(";")
+            for part in parts[:-1]:
+                statement = part.strip()
+                if statement:
+                    yield statement
+            pending = parts[-1]
+        if pending.strip():
+            raise self.error("expected ';' at end of file")
+
+    def evaluate(self, expression: str) -> float:
+        try:
+            value = float(expression)
+        except ValueError:
+            if expression not in self.expressions:
+                try:
+                    tree = ast.parse(expression.strip(), mode="eval")
+                except SyntaxError:
+                    raise self.error(f"invalid parameter {expression!r}")
+                try:
+                    self.expressions[expression] = float(self.evaluate_node(tree.body))
+                except (ArithmeticError, ValueError, TypeError):
+                    raise self.error(f"cannot evaluate parameter {expression!r}")
+            value = self.expressions[expression]
+        if not math.isfinite(value):
+            raise self.error(f"non-finite parameter {expression!r}")
+        return value
+
+    def evaluate_node(self, node: ast.AST) -> float:
+        # Constants are floats so that ** overflows instead of building huge integers.
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return float(node.value)
+        if isinstance(node, ast.Name) and node.id == "pi":
+            return math.pi
+        if isinstance(node, ast.BinOp) and type(node.op) in OPERATORS:
+            return OPERATORS[type(node.op)](self.evaluate_node(node.left), self.evaluate_node(node.right))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in OPERATORS:
+            return OPERATORS[type(node.op)](self.evaluate_node(node.operand))
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS and len(node.args) == 1:
+            return FUNCTIONS[node.func.id](self.evaluate_node(node.args[0]))
+        raise self.error(f"unsupported parameter expression {ast.unparse(node)!r}")
+
+    def operand(self, text: str, registers: dict[str, tuple[int, int]]) -> tuple[int, ...]:
+        key = (text, id(registers))
+        if key not in self.operands:
+            match = OPERAND.match(text.strip())
+            if match is None:
+                raise self.error(f"invalid operand {text!r}")
+            name, index = match.groups()
+            if name not in registers:
+                raise self.error(f"undeclared register {name!r}")
+            offset, size = registers[name]
+            if index is None:
+                self.operands[key] = tuple(range(offset, offset + size))
+            elif int(index) >= size:
+                raise self.error(f"index {index} out of range for register {name!r}")
+            else:
+                self.operands[key] = (offset + int(index),)
+        return self.operands[key]
+
+    def broadcast(self, operands: list[tuple[int, ...]]) -> typing.Iterator[tuple[int, ...]]:
+        sizes = {len(operand) for operand in operands if len(operand) > 1}
+        if len(sizes) > 1:
+            raise self.error("registers of different sizes in one statement")
+        size = sizes.pop() if sizes else 1
+        for i in range(size):
+            yield tuple(operand[i] if len(operand) > 1 else operand[0] for operand in operands)
+
+    def register(self, kind: str, name: str, size: int) -> None:
+        if name in self.qregs or name in self.cregs:
+            raise self.error(f"register {name!r} is already declared")
+        if kind == "qreg":
+            self.qregs[name] = (self.qubits, size)
+            self.qubits += size
+        else:
+            self.cregs[name] = (self.clbits, size)
+            self.clbits += size
+
+    def read(self, lines: typing.Iterable[str]) -> quantum.Circuit:
+        for statement in self.statements(lines):
+            keyword = statement.split(None, 1)[0]
+            if keyword == "OPENQASM":
+                if not statement.split(None, 1)[-1].strip().startswith("2"):
+                    raise self.error(f"unsupported version in {statement!r}")
+            elif keyword == "include" or keyword == "barrier":
+                continue
+            elif keyword == "qreg" or keyword == "creg":
+                match = REGISTER.match(statement)
+                if match is None:
+                    raise self.error(f"invalid declaration {statement!r}")
+                self.register(match.group(1), match.group(2), int(match.group(3)))
+            elif keyword == "measure":
+                match = MEASURE.match(statement)
+                if match is None:
+                    raise self.error(f"invalid measurement {statement!r}")
+                operands = [self.operand(match.group(1), self.qregs), self.operand(match.group(2), self.cregs)]
+                for qubit, clbit in self.broadcast(operands):
+                    self.instructions.append(ir.MEASURE, (qubit,), clbit)
+            else:
+                self.gate(statement)
+
+        circuit = quantum.Circuit(self.qubits, self.device)
+        circuit.instructions = self.instructions
+        return circuit
+
+    def gate(self, statement: str) -> None:
+        match = GATE.match(statement)
+        if match is None:
+            raise self.error(f"invalid statement {statement!r}")
+        mnemonic, params, operands = match.groups()
+        if mnemonic not in NAMES:
+            raise self.error(f"unsupported gate or statement {mnemonic!r}")
+
+        name = NAMES[mnemonic]
+        opcode = ir.OPCODE[name]
+        if name in PARAMETERISED:
+            if params is None or "," in params:
+                raise self.error(f"{mnemonic} takes exactly one parameter")
+            param = self.evaluate(params)
+        elif params is not None:
+            raise self.error(f"{mnemonic} takes no parameters")
+        else:
+            param = 0.0
+
+        operands = [self.operand(operand, self.qregs) for operand in operands.split(",")]
+        if len(operands) != ARITY[opcode]:
+            raise self.error(f"{mnemonic} takes {ARITY[opcode]} qubits")
+        qubits = sum(operands, ())
+        if len(qubits) == len(operands):
+            if len(set(qubits)) != len(qubits):
+                raise self.error(f"repeated qubit in {statement!r}")
+            self.instructions.append(opcode, qubits, param)
+            return
+        for qubits in self.broadcast(operands):
+            if len(set(qubits)) != len(qubits):
+                raise self.error(f"repeated qubit in {statement!r}")
+            self.instructions.append(opcode, qubits, param)
+
+
+def load(file: str | os.PathLike | typing.TextIO, device: str = "cpu") -> quantum.Circuit:
+    """
+    Read an OpenQASM 2 program into a circuit, one line at a time.
+
+    Supports qreg/creg declarations (flattened into one qubit and one classical
+    bit index space in declaration order), the gates h, x, y, z, cx, swap, ccx,
+    cswap, cy, cz, rx, ry and rz with register broadcasting, measure, and
+    parameters built from numbers, pi, arithmetic and sin/cos/tan/exp/ln/sqrt.
+    include and barrier statements are ignored; gate definitions, if, reset and
+    opaque are rejected.
+
+    Args:
+        file: A path or an open text file.
+        device (str): The device of the returned circuit.
+
+    Returns:
+        quantum.Circuit: The circuit, with measurements kept as MEASURE instructions.
+
+    Raises:
+        ParseError: On the first unsupported or malformed statement.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file) as handle:
+            return _Reader(device).read(handle)
+    return _Reader(device).read(file)
+
+def loads(text: str, device: str = "cpu") -> quantum.Circuit:
+    return _Reader(device).read(text.splitlines())
+
+def _lines(circuit: quantum.Circuit) -> typing.Iterator[str]:
+    array = circuit.instructions.array
+    measured = array["opcode"] == ir.MEASURE
+    clbits = int(array["param"][measured].max()) + 1 if measured.any() else 0
+
+    yield "OPENQASM 2.0;\n"
+    yield 'include "qelib1.inc";\n'
+    yield f"qreg q[{circuit.qubits}];\n"
+    if clbits:
+        yield f"creg c[{clbits}];\n"
+    for opcode, qubits, param in circuit.instructions:
+        if opcode == ir.MEASURE:
+            yield f"measure q[{qubits[0]}] -> c[{int(param)}];\n"
+            continue
+        name = ir.OPCODES[opcode]
+        operands = ",".join(f"q[{qubit}]" for qubit in qubits)
+        if name in PARAMETERISED:
+            yield f"{MNEMONICS[name]}({param!r}) {operands};\n"
+        else:
+            yield f"{MNEMONICS[name]} {operands};\n"
+
+def dump(circuit: quantum.Circuit, file: str | os.PathLike | typing.TextIO) -> None:
+    """
+    Write a circuit as OpenQASM 2 with a single register `q` (and `c` for measurements).
+
+    Args:
+        circuit (quantum.Circuit): The circuit to write.
+        file: A path or an open text file.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "w") as handle:
+            handle.writelines(_lines(circuit))
+    else:
+        file.writelines(_lines(circuit))
+
+def dumps(circuit: quantum.Circuit) -> str:
+    return "".join(_lines(circuit))
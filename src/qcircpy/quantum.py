@@ -1,93 +1,324 @@
+import concurrent.futures
+
 import numpy as np
 import matplotlib.pyplot
 
-from . import gates
+from . import backends
 from . import exceptions
+from . import states
+from . import ir
+from . import kernels
+from .sparse import CSR
+
+def _restore(qubits: int, device: str, instructions: np.ndarray) -> "Circuit":
+    circuit = Circuit(qubits, device)
+    circuit.instructions = ir.Instructions.from_array(instructions)
+    return circuit
+
 
 class Circuit:
     def __init__(self, qubits: int, device: str = "cpu") -> None:
         self.device = device
-        if device != "cpu" and device != "gpu":
-            raise exceptions.DeviceError(device)
-        elif device == "cpu":
-            self.module = np
+        self.backend = backends.get(device)
+        self.module = self.backend.module
         
-        self.matrix = self.module.identity(2 ** qubits, dtype=complex)
+        self.matrix = None
         self.qubits = qubits
-        self.gates = []
+        self.instructions = ir.Instructions()
+
+    def __reduce__(self) -> tuple:
+        # Pickle only the instruction records; compiled matrices are dropped.
+        return _restore, (self.qubits, self.device, self.instructions.array.copy())
     
-    def __call__(self, state: str) -> np.ndarray:
-        if len(state) != self.qubits:
+    def __call__(self, state: str | int) -> np.ndarray:
+        if isinstance(state, int):
+            index = state
+        elif len(state) != self.qubits:
             raise exceptions.StateError(state)
-        if state[0] == "1":
-            output = self.module.array([[0], [1]], dtype=complex)
-        elif state[0] == "0":
-            output = self.module.array([[1], [0]], dtype=complex)
-        
-        for i, bit in enumerate(state[1:]):
-            if bit == "1":
-                qubit = self.module.array([[0], [1]], dtype=complex)
-            elif bit == "0":
-                qubit = self.module.array([[1], [0]], dtype=complex)
-            else:
-                raise exceptions.StateError(state)
-            output = self.module.kron(output, qubit)
-        
-        for gate in self.gates:
-            output = gate @ output
-        
-        return output
-        
-    def __single_qubit_gate(self, gate: np.ndarray, qubit: int) -> np.ndarray:
-        identity = self.module.identity(2, dtype=complex)
-
-        if qubit == 0:
-            applied_gate = gate
         else:
-            applied_gate = identity
-        for i in range(1, self.qubits):
-            if i == qubit:
-                applied_gate = self.module.kron(applied_gate, gate)
+            index = states.basis_index(state)
+        output = states.basis_state(index, self.qubits, self.module)
+        return self.evolve(output)
+
+    def evolve(self, vectors: np.ndarray) -> np.ndarray:
+        if self.backend.inplace:
+            vectors = vectors.copy()
+        for opcode, qubits, param in self.instructions:
+            if opcode != ir.MEASURE:
+                vectors = self.backend.apply(vectors, ir.matrix(opcode, param, self.device), qubits)
+        return vectors
+
+    @property
+    def gates(self) -> tuple[np.ndarray, ...]:
+        # A tuple, not a list: the matrices are rebuilt from `instructions` on every
+        # access, so appending to them could never add a gate to the circuit.
+        return tuple(kernels.expand(ir.matrix(opcode, param, self.device), qubits, self.qubits)
+                     for opcode, qubits, param in self.instructions if opcode != ir.MEASURE)
+
+    def __check_qubits(self, *qubits: int) -> None:
+        for qubit in qubits:
+            if qubit < 0 or qubit >= self.qubits:
+                raise exceptions.StateError(str(qubit))
+        if len(set(qubits)) != len(qubits):
+            raise exceptions.StateError(str(qubits))
+
+    def append(self, name: str, qubits: tuple[int, ...], param: float = 0.0) -> None:
+        if name not in ir.OPCODE:
+            raise exceptions.StateError(name)
+        if len(qubits) != ir.ARITY[ir.OPCODE[name]]:
+            raise exceptions.StateError(str(qubits))
+        self.__check_qubits(*qubits)
+        self.instructions.append(ir.OPCODE[name], qubits, param)
+
+    def compile(self, chunk: int | None = None, workers: int = 1, sparse: bool = False, atol: float = 1e-12) -> np.ndarray | CSR:
+        size = 2 ** self.qubits
+        if chunk is None:
+            chunk = min(size, 256) if sparse else size
+        chunk = max(1, min(chunk, size))
+        if chunk == size and not sparse:
+            # A single dense chunk is the whole matrix, so it is returned as evolved.
+            self.matrix = self.evolve(self.module.identity(size, dtype=complex))
+            return self.matrix
+        matrix = None if sparse else self.module.empty((size, size), dtype=complex)
+        entries = {}
+
+        def columns(start: int) -> None:
+            stop = min(start + chunk, size)
+            block = self.module.zeros((size, stop - start), dtype=complex)
+            block[self.module.arange(start, stop), self.module.arange(stop - start)] = 1
+            block = self.evolve(block)
+            if sparse:
+                # Only the non-zeros of each block of columns are kept, so peak memory
+                # is one dense block plus the sparse result.
+                rows, offsets = np.nonzero(np.abs(block) > atol)
+                entries[start] = (rows, offsets + start, block[rows, offsets])
             else:
-                applied_gate = self.module.kron(applied_gate, identity)
-        return applied_gate
-    
-    def __double_qubit_gate(self, gate: np.ndarray, qubit1: int, qubit2: int) -> np.ndarray:
-        identity = self.module.identity(2, dtype=complex)
+                matrix[:, start:stop] = block
 
-        if qubit1 == 0:
-            applied_gate = gate
+        if workers > 1:
+            with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+                list(pool.map(columns, range(0, size, chunk)))
         else:
-            applied_gate = identity
-        for i in range(1, self.qubits-1):
-            if i == qubit1:
-                applied_gate = self.module.kron(applied_gate, gate)
+            for start in range(0, size, chunk):
+                columns(start)
 
-    def compile(self) -> np.ndarray:
-        for gate in self.gates:
-            self.matrix = gate @ self.matrix
-        return self.matrix
+        if sparse:
+            rows, columns, values = (np.concatenate([entries[start][part] for start in sorted(entries)]) for part in range(3))
+            matrix = CSR.from_coo(rows, columns, values, (size, size))
+        self.matrix = matrix
+        return matrix
+
+    def apply_operator(self, vectors: np.ndarray, operator: np.ndarray | CSR | None = None) -> np.ndarray:
+        """
+        Apply an explicit operator, the compiled matrix by default, with one dense
+        or sparse matrix product. SciPy sparse matrices are accepted as well.
+        """
+        operator = self.matrix if operator is None else operator
+        if operator is None:
+            raise exceptions.StateError("uncompiled circuit")
+        if tuple(operator.shape) != (2 ** self.qubits, 2 ** self.qubits) or vectors.shape[0] != 2 ** self.qubits:
+            raise exceptions.StateError(str(vectors.shape))
+        return np.asarray(operator @ vectors, dtype=complex)
 
     def measure(self, state: str) -> str:
         called = self(state)
         probabilities = np.abs(called) ** 2
         probabilities = probabilities.flatten()
-        output_states = [str(i) for i in range(len(probabilities))]
-        output = np.random.choice(output_states, p=probabilities)
-        output = f"{bin(int(output))[2:]:0>{self.qubits}}"
+        output = np.random.choice(len(probabilities), p=probabilities / probabilities.sum())
+        output = f"{output:0>{self.qubits}b}"
         return output
     
     def hadamard(self, qubit: int) -> None:
-        self.gates.append(self.__single_qubit_gate(gates.GATES[self.device]["HADAMARD"], qubit))
+        self.append("HADAMARD", (qubit,))
 
     def pauli_x(self, qubit: int) -> None:
-        self.gates.append(self.__single_qubit_gate(gates.GATES[self.device]["PAULI_X"], qubit))
+        self.append("PAULI_X", (qubit,))
     
     def pauli_y(self, qubit: int) -> None:
-        self.gates.append(self.__single_qubit_gate(gates.GATES[self.device]["PAULI_Y"], qubit))
+        self.append("PAULI_Y", (qubit,))
     
     def pauli_z(self, qubit: int) -> None:
-        self.gates.append(self.__single_qubit_gate(gates.GATES[self.device]["PAULI_Z"], qubit))
+        self.append("PAULI_Z", (qubit,))
+
+    def rx(self, qubit: int, theta: float) -> None:
+        self.append("RX", (qubit,), theta)
+
+    def ry(self, qubit: int, theta: float) -> None:
+        self.append("RY", (qubit,), theta)
+
+    def rz(self, qubit: int, theta: float) -> None:
+        self.append("RZ", (qubit,), theta)
+
+    def cnot(self, control: int, target: int) -> None:
+        self.append("CNOT", (control, target))
+
+    def cy(self, control: int, target: int) -> None:
+        self.append("CY", (control, target))
+
+    def cz(self, control: int, target: int) -> None:
+        self.append("CZ", (control, target))
     
     def swap(self, qubit1: int, qubit2: int) -> None:
-        self.gates.append(self.__double_qubit_gate(gates.GATES[self.device]["SWAP"], qubit1, qubit2))
+        self.append("SWAP", (qubit1, qubit2))
+
+    def toffoli(self, control1: int, control2: int, target: int) -> None:
+        self.append("TOFFOLI", (control1, control2, target))
+
+    def cswap(self, control: int, target1: int, target2: int) -> None:
+        self.append("CSWAP", (control, target1, target2))
+
+
+class QRAM:
+    """
+    Quantum Random Access Memory (QRAM) class.
+
+    State vectors are stored back to back in one contiguous, capacity-doubling
+    buffer, with an (offset, length) entry per address. Deleted blocks go on a
+    free-list keyed by length and are reused by later stores of the same size;
+    the buffer is compacted once free space exceeds the live data.
+
+    Args:
+        device (str): The device to be used for computation. A name registered in `backends`, such as "cpu" or "cpu-jit".
+        *args: State vectors, or objects with a `get_state()` method, to store.
+        capacity (int): Initial buffer capacity in amplitudes.
+
+    Attributes:
+        device (str): The device used for computation.
+        module (module): The module used for computation based on the device.
+        addresses (list[int]): The live addresses, in the order they were stored.
+
+    Methods:
+        __str__(): Returns a string representation of the QRAM.
+        store(*args): Stores states and returns their addresses.
+        fetch(address): Returns a zero-copy view of the state at an address.
+        delete(address): Frees the state at an address.
+        compact(): Moves the live states to the front of the buffer.
+        read_contents(): Returns all live states as one contiguous column.
+
+    Raises:
+        DeviceError: If an invalid device is provided.
+    """
+
+    def __init__(self, device: str = "cpu", *args, capacity: int = 64) -> None:
+        self.device = device
+        self.backend = backends.get(device)
+        self.module = self.backend.module
+
+        self.__buffer = self.module.empty(max(capacity, 1), dtype=complex)
+        self.__end = 0
+        self.__index = {}
+        self.__free = {}
+        self.__freed = 0
+        self.__next = 0
+        self.store(*args)
+
+    def __str__(self) -> str:
+        lengths = [length for _, length in self.__index.values()]
+        return f"Quantum Memory Unit with {len(lengths)} states of spaces {[length.bit_length() - 1 for length in lengths]}, occupying {lengths} vector spaces."
+
+    def __len__(self) -> int:
+        return len(self.__index)
+
+    @property
+    def addresses(self) -> list[int]:
+        return list(self.__index)
+
+    def __reserve(self, size: int) -> None:
+        if size > len(self.__buffer):
+            buffer = self.module.empty(max(size, 2 * len(self.__buffer)), dtype=complex)
+            buffer[:self.__end] = self.__buffer[:self.__end]
+            self.__buffer = buffer
+
+    def store(self, *args) -> list[int]:
+        """
+        Stores states in the QRAM.
+
+        Args:
+            *args: State vectors of length 2^k, or objects with a `get_state()` method.
+
+        Returns:
+            list[int]: The address of each stored state.
+        """
+        addresses = []
+        for state in args:
+            if hasattr(state, "get_state"):
+                state = state.get_state()
+            state = self.module.asarray(state).reshape(-1)
+            length = len(state)
+            if length < 2 or length & (length - 1) != 0:
+                raise exceptions.StateError(str(length))
+
+            if self.__free.get(length):
+                offset = self.__free[length].pop()
+                self.__freed -= length
+            else:
+                self.__reserve(self.__end + length)
+                offset = self.__end
+                self.__end += length
+
+            self.__buffer[offset:offset + length] = state
+            self.__index[self.__next] = (offset, length)
+            addresses.append(self.__next)
+            self.__next += 1
+        return addresses
+
+    def fetch(self, address: int) -> np.ndarray:
+        """
+        Fetches the state at the given address as a (2^k, 1) view into the buffer.
+
+        The view shares memory with the QRAM and is only valid until the next
+        store that grows the buffer or the next compaction.
+
+        Args:
+            address: The address of the state to fetch.
+
+        Returns:
+            The state at the given address.
+        """
+        if address not in self.__index:
+            raise exceptions.StateError(str(address))
+        offset, length = self.__index[address]
+        return self.__buffer[offset:offset + length].reshape(-1, 1)
+
+    def delete(self, address: int) -> None:
+        """
+        Deletes the state at the given address. Its space is reused by later stores.
+
+        Args:
+            address: The address of the state to delete.
+        """
+        if address not in self.__index:
+            raise exceptions.StateError(str(address))
+        offset, length = self.__index.pop(address)
+        self.__free.setdefault(length, []).append(offset)
+        self.__freed += length
+        if self.__freed > self.__end - self.__freed:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Moves the live states to the front of the buffer, keeping their relative
+        order in the buffer, and clears the free-list.
+        """
+        # Blocks are moved in offset order so each one only moves towards the front
+        # and never overwrites a block that has not been moved yet; a block reusing
+        # a freed hole can sit before blocks stored earlier.
+        end = 0
+        for address, (offset, length) in sorted(self.__index.items(), key=lambda item: item[1][0]):
+            if offset != end:
+                self.__buffer[end:end + length] = self.__buffer[offset:offset + length]
+            self.__index[address] = (end, length)
+            end += length
+        self.__end = end
+        self.__free.clear()
+        self.__freed = 0
+
+    def read_contents(self) -> np.ndarray:
+        """
+        Returns the data stored in the QRAM.
+
+        Returns:
+            The live states concatenated in buffer order, as a (N, 1) view.
+        """
+        self.compact()
+        return self.__buffer[:self.__end].reshape(-1, 1)
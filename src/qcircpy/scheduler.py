@@ -0,0 +1,133 @@
+import numpy as np
+
+from . import exceptions
+from . import ir
+from . import kernels
+from . import quantum
+
+# 2^16 complex128 amplitudes are 1 MiB, which fits a typical L2 cache.
+BLOCK = 16
+
+
+class Schedule:
+    """
+    A circuit's gates grouped into layers that act on disjoint qubits.
+
+    Layers are built as soon as possible: every gate goes in the layer after the
+    last one touching any of its qubits. A layer is local when all its gates act
+    on the `block` least significant qubits (the highest indices), so it can be
+    applied one contiguous block of 2^block amplitudes at a time.
+
+    Attributes:
+        layers (list[np.ndarray]): Instruction indices of each layer, in circuit order.
+        widths (np.ndarray): The number of gates in each layer.
+        local (np.ndarray): Whether each layer is local.
+        qubits (int): The number of qubits.
+        block (int): The block size in qubits.
+    """
+
+    def __init__(self, layers: list[np.ndarray], local: np.ndarray, qubits: int, block: int) -> None:
+        self.layers = layers
+        self.widths = np.array([len(layer) for layer in layers], dtype=np.intp)
+        self.local = local
+        self.qubits = qubits
+        self.block = block
+
+    @property
+    def depth(self) -> int:
+        return len(self.layers)
+
+    @property
+    def passes(self) -> int:
+        """
+        The number of sweeps over the state: one per gate in non-local layers and
+        one per run of consecutive local layers.
+        """
+        runs = int(self.local[0]) + int(np.count_nonzero(self.local[1:] & ~self.local[:-1])) if self.depth else 0
+        return runs + int(self.widths[~self.local].sum())
+
+    def __repr__(self) -> str:
+        return f"Schedule(depth={self.depth}, gates={int(self.widths.sum())}, local={int(self.local.sum())}, passes={self.passes})"
+
+
+def schedule(circuit: quantum.Circuit, block: int = BLOCK) -> Schedule:
+    """
+    Partition a circuit's gates into layers of disjoint qubits. MEASURE
+    instructions are left out, as in `quantum.Circuit.evolve`.
+    """
+    array = circuit.instructions.array
+    gates = np.flatnonzero(array["opcode"] != ir.MEASURE)
+    targets = array["qubits"][gates]
+
+    frontier = [0] * circuit.qubits
+    levels = np.empty(len(gates), dtype=np.intp)
+    for position, qubits in enumerate(targets.tolist()):
+        qubits = [qubit for qubit in qubits if qubit >= 0]
+        level = max(frontier[qubit] for qubit in qubits)
+        for qubit in qubits:
+            frontier[qubit] = level + 1
+        levels[position] = level
+
+    order = np.argsort(levels, kind="stable")
+    counts = np.bincount(levels, minlength=0)
+    layers = np.split(gates[order], np.cumsum(counts)[:-1]) if len(gates) else []
+
+    lowest = np.where(targets < 0, circuit.qubits, targets).min(axis=1)[order]
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.intp)
+    local = np.minimum.reduceat(lowest, starts) >= circuit.qubits - block if len(gates) else np.zeros(0, dtype=bool)
+    return Schedule(layers, local, circuit.qubits, block)
+
+def evolve(circuit: quantum.Circuit, states: np.ndarray, plan: Schedule | None = None) -> np.ndarray:
+    """
+    Apply a circuit to a (2^n,) state or (2^n, m) block of states layer by layer.
+
+    Runs of consecutive local layers are applied in one tiled sweep: every gate
+    of the run is applied to one contiguous block of 2^block amplitudes before
+    moving to the next, so the run streams the state through memory once
+    instead of once per gate. Other layers apply their gates one by one.
+
+    Args:
+        circuit (quantum.Circuit): The circuit.
+        states (np.ndarray): The input, which is not modified.
+        plan (Schedule | None): A schedule of `circuit`, built with the default block size if omitted.
+
+    Returns:
+        np.ndarray: The evolved states.
+    """
+    plan = schedule(circuit) if plan is None else plan
+    if plan.qubits != circuit.qubits or states.shape[0] != 2 ** circuit.qubits:
+        raise exceptions.StateError(str(states.shape))
+    array = circuit.instructions.array
+    matrices = {}
+
+    def gate(index: int) -> tuple[np.ndarray, tuple[int, ...]]:
+        opcode, qubits, param = array[index]
+        key = (int(opcode), float(param))
+        if key not in matrices:
+            matrices[key] = ir.matrix(key[0], key[1], circuit.device)
+        return matrices[key], tuple(int(qubit) for qubit in qubits[:ir.ARITY[opcode]])
+
+    offset = max(0, circuit.qubits - plan.block)
+    output = states
+    position = 0
+    while position < plan.depth:
+        if not plan.local[position]:
+            for index in plan.layers[position]:
+                output = kernels.apply(output, *gate(index))
+            position += 1
+            continue
+
+        end = position
+        while end < plan.depth and plan.local[end]:
+            end += 1
+        run = [gate(index) for layer in plan.layers[position:end] for index in layer]
+        run = [(matrix, tuple(qubit - offset for qubit in qubits)) for matrix, qubits in run]
+        output = output.copy() if output is states else output
+        blocks = output.reshape((2 ** offset, 2 ** (circuit.qubits - offset)) + output.shape[1:])
+        for number in range(len(blocks)):
+            block = blocks[number]
+            for matrix, qubits in run:
+                block = kernels.apply(block, matrix, qubits)
+            blocks[number] = block
+        position = end
+    return output
@@ -0,0 +1,117 @@
+import numpy as np
+
+from . import exceptions
+
+try:
+    import scipy.sparse
+except ImportError:
+    scipy = None
+
+SCIPY = scipy is not None
+
+
+class CSR:
+    """
+    A compressed sparse row matrix, for operators with few non-zeros per row.
+
+    Controlled and permutation gates expanded to n qubits have one or two
+    non-zeros per row, so they take O(nnz) memory instead of O(4^n). Products
+    with dense states use SciPy's sparse matvec when SciPy is installed and a
+    vectorised NumPy fallback otherwise.
+
+    Args:
+        indptr (np.ndarray): Row i's entries are at positions indptr[i]:indptr[i + 1].
+        indices (np.ndarray): The column of each entry.
+        data (np.ndarray): The value of each entry.
+        shape (tuple[int, int]): The matrix shape.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, shape: tuple[int, int]) -> None:
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.data = np.asarray(data, dtype=complex)
+        self.shape = tuple(shape)
+        if len(self.indptr) != self.shape[0] + 1 or len(self.indices) != len(self.data) or self.indptr[-1] != len(self.data):
+            raise exceptions.StateError(str(self.shape))
+        self.__scipy = None
+
+    @classmethod
+    def from_coo(cls, rows: np.ndarray, columns: np.ndarray, values: np.ndarray, shape: tuple[int, int]) -> "CSR":
+        """
+        Build from (row, column, value) triples with no repeated positions.
+        """
+        rows, columns, values = np.asarray(rows), np.asarray(columns), np.asarray(values)
+        order = np.lexsort((columns, rows))
+        indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=shape[0]), out=indptr[1:])
+        return cls(indptr, columns[order], values[order], shape)
+
+    @classmethod
+    def from_dense(cls, matrix: np.ndarray, atol: float = 0.0) -> "CSR":
+        rows, columns = np.nonzero(np.abs(matrix) > atol)
+        return cls.from_coo(rows, columns, matrix[rows, columns], matrix.shape)
+
+    @classmethod
+    def from_scipy(cls, matrix) -> "CSR":
+        matrix = matrix.tocsr()
+        return cls(matrix.indptr, matrix.indices, matrix.data, matrix.shape)
+
+    @property
+    def nnz(self) -> int:
+        return len(self.data)
+
+    @property
+    def nbytes(self) -> int:
+        return self.indptr.nbytes + self.indices.nbytes + self.data.nbytes
+
+    def to_dense(self) -> np.ndarray:
+        output = np.zeros(self.shape, dtype=complex)
+        rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        output[rows, self.indices] = self.data
+        return output
+
+    def to_scipy(self):
+        if not SCIPY:
+            raise ImportError("SciPy is required to convert to a scipy.sparse matrix.")
+        return scipy.sparse.csr_array((self.data, self.indices, self.indptr), shape=self.shape)
+
+    def __matmul__(self, other: np.ndarray) -> np.ndarray:
+        if isinstance(other, CSR):
+            return NotImplemented
+        if other.shape[0] != self.shape[1]:
+            raise exceptions.StateError(str(other.shape))
+        if SCIPY:
+            if self.__scipy is None:
+                self.__scipy = self.to_scipy()
+            return np.asarray(self.__scipy @ other)
+        output = np.zeros((self.shape[0],) + other.shape[1:], dtype=np.result_type(self.data, other))
+        counts = np.diff(self.indptr)
+        filled = counts > 0
+        if self.nnz:
+            products = self.data.reshape((-1,) + (1,) * (other.ndim - 1)) * other[self.indices]
+            output[filled] = np.add.reduceat(products, self.indptr[:-1][filled], axis=0)
+        return output
+
+    def __repr__(self) -> str:
+        return f"CSR(shape={self.shape}, nnz={self.nnz})"
+
+
+def expand(gate: np.ndarray, qubits: tuple[int, ...] | list[int], size: int, atol: float = 0.0) -> CSR:
+    """
+    The sparse 2^size x 2^size matrix of a k-qubit gate acting on `qubits`,
+    built by index arithmetic without forming the dense matrix.
+    """
+    qubits = list(qubits)
+    width = len(qubits)
+    rows = np.arange(2 ** size, dtype=np.int64)
+    positions = np.array([size - 1 - qubit for qubit in qubits], dtype=np.int64)
+    bits = (rows[:, None] >> positions) & 1
+    local = (bits << np.arange(width - 1, -1, -1)).sum(axis=1)
+    cleared = rows & ~np.bitwise_or.reduce(1 << positions)
+
+    entries = np.arange(2 ** width)
+    patterns = ((entries[:, None] >> np.arange(width - 1, -1, -1)) & 1) << positions
+    columns = cleared[:, None] | patterns.sum(axis=1)
+    values = np.asarray(gate, dtype=complex)[local]
+    keep = np.abs(values) > atol
+    return CSR.from_coo(np.broadcast_to(rows[:, None], keep.shape)[keep], columns[keep], values[keep], (2 ** size, 2 ** size))
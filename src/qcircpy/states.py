@@ -0,0 +1,123 @@
+import numpy as np
+
+from . import exceptions
+
+COMPLEX_FORMATS = ("Zd", "<Zd", "=Zd", "@Zd")
+
+def basis_index(state: str) -> int:
+    if len(state) == 0 or any(bit != "0" and bit != "1" for bit in state):
+        raise exceptions.StateError(state)
+    return int(state, 2)
+
+def basis_state(index: int, qubits: int, module=np) -> np.ndarray:
+    if index < 0 or index >= 2 ** qubits:
+        raise exceptions.StateError(str(index))
+    output = module.zeros((2 ** qubits, 1), dtype=complex)
+    output[index, 0] = 1
+    return output
+
+def adopt(amplitudes, atol: float = 1e-8) -> np.ndarray:
+    """
+    Wrap an existing amplitude buffer as a state column without copying it.
+
+    Args:
+        amplitudes: A complex128 NumPy array, or any object exposing the buffer
+            protocol with complex128 items (format "Zd") or raw bytes.
+        atol (float): Tolerance on the squared norm of the amplitudes.
+
+    Returns:
+        np.ndarray: A (2^n, 1) view sharing memory with `amplitudes`.
+
+    Raises:
+        AmplitudeError: If the buffer has the wrong dtype, length or layout,
+            is read-only, or is not normalised.
+    """
+    if isinstance(amplitudes, np.ndarray):
+        array = amplitudes
+    else:
+        try:
+            view = memoryview(amplitudes)
+        except TypeError:
+            raise exceptions.AmplitudeError("object does not support the buffer protocol")
+        if view.format in COMPLEX_FORMATS:
+            array = np.asarray(view)
+        elif view.format in ("B", "b", "c"):
+            if view.nbytes % np.dtype(complex).itemsize != 0:
+                raise exceptions.AmplitudeError(f"{view.nbytes} bytes is not a whole number of complex128 items")
+            array = np.frombuffer(view, dtype=complex)
+        else:
+            raise exceptions.AmplitudeError(f"buffer format {view.format!r} is not complex128")
+
+    if array.dtype != np.complex128:
+        raise exceptions.AmplitudeError(f"dtype {array.dtype} is not complex128")
+    if array.ndim == 2 and array.shape[1] == 1:
+        array = array[:, 0]
+    if array.ndim != 1:
+        raise exceptions.AmplitudeError(f"shape {array.shape} is not a vector")
+    if array.size < 2 or array.size & (array.size - 1) != 0:
+        raise exceptions.AmplitudeError(f"length {array.size} is not a power of two")
+    if not array.flags.c_contiguous:
+        raise exceptions.AmplitudeError("buffer is not contiguous")
+    if not array.flags.writeable:
+        raise exceptions.AmplitudeError("buffer is read-only")
+
+    norm = np.vdot(array, array).real
+    if abs(norm - 1) > atol:
+        raise exceptions.AmplitudeError(f"squared norm is {norm}, not 1")
+    return array.reshape(-1, 1)
+
+
+class StateView:
+    """
+    A read-only, zero-copy export of a state vector.
+
+    The wrapped array shares memory with the runtime that produced it, which
+    copies its buffer before any later in-place update, so the view keeps the
+    amplitudes it was exported with. Other libraries can consume it through
+    `np.asarray`, the buffer protocol (`memoryview`, Python 3.12+ via
+    `__buffer__`) or DLPack. DLPack consumers must request version 1.0 or
+    later, the first that can mark a tensor read-only.
+
+    Attributes:
+        array (np.ndarray): The read-only view, of shape (2^n, 1) or (2^n,).
+        qubits (int): The number of qubits.
+    """
+
+    def __init__(self, array: np.ndarray) -> None:
+        if array.flags.writeable:
+            array = array.view()
+            array.flags.writeable = False
+        self.array = array
+        self.qubits = array.shape[0].bit_length() - 1
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self.array.shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.array.dtype
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def __array__(self, dtype: np.dtype | None = None, copy: bool | None = None) -> np.ndarray:
+        if copy:
+            return np.array(self.array, dtype=dtype, copy=True)
+        if dtype is None or np.dtype(dtype) == self.array.dtype:
+            return self.array
+        if copy is False:
+            raise ValueError("Exporting with a different dtype requires a copy.")
+        return self.array.astype(dtype)
+
+    def __buffer__(self, flags: int) -> memoryview:
+        return memoryview(self.array)
+
+    def __dlpack__(self, *, stream=None, max_version: tuple[int, int] | None = None, dl_device=None, copy: bool | None = None):
+        return self.array.__dlpack__(stream=stream, max_version=max_version, dl_device=dl_device, copy=copy)
+
+    def __dlpack_device__(self) -> tuple[int, int]:
+        return self.array.__dlpack_device__()
+
+    def __repr__(self) -> str:
+        return f"StateView(qubits={self.qubits}, shape={self.shape})"
\ No newline at end of file
@@ -0,0 +1,230 @@
+import heapq
+import itertools
+
+import numpy as np
+
+from . import exceptions
+from . import ir
+from . import quantum
+from . import states
+
+BASIS = (np.array([1, 0], dtype=complex), np.array([0, 1], dtype=complex))
+
+
+class ContractionPlan:
+    """
+    A pairwise contraction order for a tensor network and its estimated cost.
+
+    Every index has dimension 2, so tensor sizes are powers of two.
+
+    Attributes:
+        path (list[tuple[int, int]]): Pairs of tensor ids to contract, in order.
+            Each contraction creates a tensor with the next unused id.
+        flops (int): Estimated multiply-adds over all contractions.
+        width (int): Largest number of indices on any intermediate tensor.
+        size (int): Largest intermediate tensor, in bytes.
+        moved (int): Bytes read and written over all contractions, counting
+            both operands and the result of each.
+    """
+
+    def __init__(self, path: list[tuple[int, int]], flops: int, width: int, moved: int = 0) -> None:
+        self.path = path
+        self.flops = flops
+        self.width = width
+        self.size = 2 ** width * np.dtype(complex).itemsize
+        self.moved = moved
+
+    def __repr__(self) -> str:
+        return f"ContractionPlan(steps={len(self.path)}, flops={self.flops:.3e}, width={self.width}, size={self.size} bytes)"
+
+
+def greedy(networks: list[frozenset[int]]) -> ContractionPlan:
+    """
+    Find a contraction order by repeatedly contracting the pair of connected
+    tensors that shrinks (or least grows) the total tensor size, breaking ties
+    by flops. Disconnected components are joined by outer products at the end.
+
+    Args:
+        networks: The index labels of each tensor. Each label must appear on at
+            most two tensors; labels on one tensor are left open.
+
+    Returns:
+        ContractionPlan: The order and its estimated cost.
+    """
+    alive = dict(enumerate(networks))
+    owners = {}
+    for tensor, labels in alive.items():
+        for label in labels:
+            owners.setdefault(label, set()).add(tensor)
+
+    heap = []
+    counter = itertools.count()
+
+    def push(first: int, second: int) -> None:
+        a, b = alive[first], alive[second]
+        result = a ^ b
+        cost = 2 ** len(result) - 2 ** len(a) - 2 ** len(b)
+        heapq.heappush(heap, (cost, 2 ** len(a | b), next(counter), first, second))
+
+    for tensor, labels in alive.items():
+        for neighbour in {owner for label in labels for owner in owners[label]}:
+            if neighbour > tensor:
+                push(tensor, neighbour)
+
+    path = []
+    flops = 0
+    moved = 0
+    width = max((len(labels) for labels in networks), default=0)
+    following = len(networks)
+    while len(alive) > 1:
+        while heap and (heap[0][3] not in alive or heap[0][4] not in alive):
+            heapq.heappop(heap)
+        if heap:
+            _, _, _, first, second = heapq.heappop(heap)
+        else:
+            first, second = sorted(alive, key=lambda tensor: len(alive[tensor]))[:2]
+
+        a, b = alive.pop(first), alive.pop(second)
+        result = a ^ b
+        path.append((first, second))
+        flops += 2 ** len(a | b)
+        moved += (2 ** len(a) + 2 ** len(b) + 2 ** len(result)) * np.dtype(complex).itemsize
+        width = max(width, len(result))
+        alive[following] = result
+        for label in a | b:
+            owners[label].discard(first)
+            owners[label].discard(second)
+        for label in result:
+            owners[label].add(following)
+        for neighbour in {owner for label in result for owner in owners[label]} - {following}:
+            push(neighbour, following)
+        following += 1
+    return ContractionPlan(path, flops, width, moved)
+
+def contract(tensors: list[tuple[np.ndarray, tuple[int, ...]]], plan: ContractionPlan) -> tuple[np.ndarray, tuple[int, ...]]:
+    tensors = dict(enumerate(tensors))
+    following = len(tensors)
+    for first, second in plan.path:
+        a, labels_a = tensors.pop(first)
+        b, labels_b = tensors.pop(second)
+        shared = [label for label in labels_a if label in labels_b]
+        axes = ([labels_a.index(label) for label in shared], [labels_b.index(label) for label in shared])
+        result = np.tensordot(a, b, axes=axes)
+        labels = tuple(label for label in labels_a if label not in shared) + tuple(label for label in labels_b if label not in shared)
+        tensors[following] = (result, labels)
+        following += 1
+    return tensors.popitem()[1]
+
+
+class TensorNetwork:
+    """
+    Tensor-network view of a circuit for amplitudes and small marginals.
+
+    Each gate becomes a tensor with one index per input and output qubit, the
+    initial state and any fixed outputs become rank-1 basis vectors, and the
+    network is contracted pairwise along a greedy order. Memory scales with the
+    widest intermediate tensor rather than with 2^n, so shallow circuits on
+    many qubits are cheap.
+
+    Args:
+        circuit (quantum.Circuit): The circuit; MEASURE instructions are ignored.
+        state (str | None): The initial basis state, all zeros by default.
+    """
+
+    def __init__(self, circuit: quantum.Circuit, state: str | None = None) -> None:
+        self.qubits = circuit.qubits
+        self.state = "0" * circuit.qubits if state is None else state
+        if len(self.state) != self.qubits:
+            raise exceptions.StateError(self.state)
+        states.basis_index(self.state)
+        self.gates = [(ir.matrix(opcode, param, circuit.device), qubits)
+                      for opcode, qubits, param in circuit.instructions if opcode != ir.MEASURE]
+
+    def __circuit(self, labels: itertools.count, conjugate: bool) -> tuple[list, list[int]]:
+        wires = [next(labels) for _ in range(self.qubits)]
+        tensors = [(BASIS[int(bit)], (wire,)) for bit, wire in zip(self.state, wires)]
+        for matrix, qubits in self.gates:
+            width = len(qubits)
+            outputs = tuple(next(labels) for _ in qubits)
+            tensor = matrix.reshape((2,) * (2 * width))
+            tensors.append((tensor.conj() if conjugate else tensor, outputs + tuple(wires[qubit] for qubit in qubits)))
+            for qubit, output in zip(qubits, outputs):
+                wires[qubit] = output
+        return tensors, wires
+
+    def __amplitude_network(self, bitstring: str) -> tuple[list, tuple[int, ...]]:
+        if len(bitstring) != self.qubits:
+            raise exceptions.StateError(bitstring)
+        states.basis_index(bitstring)
+        tensors, wires = self.__circuit(itertools.count(), False)
+        tensors += [(BASIS[int(bit)], (wire,)) for bit, wire in zip(bitstring, wires)]
+        return tensors, ()
+
+    def __marginal_network(self, qubits: list[int]) -> tuple[list, tuple[int, ...]]:
+        for qubit in qubits:
+            if qubit < 0 or qubit >= self.qubits:
+                raise exceptions.StateError(str(qubit))
+        if len(set(qubits)) != len(qubits):
+            raise exceptions.StateError(str(qubits))
+
+        labels = itertools.count()
+        tensors, wires = self.__circuit(labels, False)
+        conjugate, conjugate_wires = self.__circuit(labels, True)
+        rename = {conjugate_wires[qubit]: wires[qubit] for qubit in range(self.qubits) if qubit not in qubits}
+        tensors += [(tensor, tuple(rename.get(label, label) for label in axes)) for tensor, axes in conjugate]
+        return tensors, tuple(wires[qubit] for qubit in qubits) + tuple(conjugate_wires[qubit] for qubit in qubits)
+
+    def plan(self, bitstring: str | None = None, qubits: list[int] | None = None) -> ContractionPlan:
+        """
+        Estimate the cost of `amplitude(bitstring)` or `marginal(qubits)` without contracting.
+        """
+        if (bitstring is None) == (qubits is None):
+            raise ValueError("Pass exactly one of bitstring or qubits.")
+        tensors, _ = self.__amplitude_network(bitstring) if bitstring is not None else self.__marginal_network(list(qubits))
+        return greedy([frozenset(labels) for _, labels in tensors])
+
+    def __contract(self, tensors: list, outputs: tuple[int, ...], max_size: int | None) -> np.ndarray:
+        plan = greedy([frozenset(labels) for _, labels in tensors])
+        if max_size is not None and plan.size > max_size:
+            raise exceptions.ResourceError(f"contraction needs a {plan.size} byte intermediate, over the {max_size} byte limit")
+        result, labels = contract(tensors, plan)
+        return np.transpose(result, [labels.index(label) for label in outputs])
+
+    def amplitude(self, bitstring: str, max_size: int | None = None) -> complex:
+        """
+        Compute ⟨bitstring|C|state⟩.
+
+        Args:
+            bitstring (str): The output basis state, qubit 0 first.
+            max_size (int | None): Refuse plans whose largest intermediate exceeds this many bytes.
+
+        Returns:
+            complex: The amplitude.
+        """
+        tensors, outputs = self.__amplitude_network(bitstring)
+        return complex(self.__contract(tensors, outputs, max_size))
+
+    def reduced_density_matrix(self, qubits: list[int], max_size: int | None = None) -> np.ndarray:
+        """
+        Compute the reduced density matrix of a few qubits by contracting the circuit
+        with its conjugate over all other outputs.
+
+        Args:
+            qubits: The qubits to keep, in the order of the result's tensor factors.
+            max_size (int | None): Refuse plans whose largest intermediate exceeds this many bytes.
+
+        Returns:
+            np.ndarray: A (2^k, 2^k) density matrix.
+        """
+        tensors, outputs = self.__marginal_network(list(qubits))
+        result = self.__contract(tensors, outputs, max_size)
+        return result.reshape(2 ** len(qubits), 2 ** len(qubits))
+
+    def marginal(self, qubits: list[int], max_size: int | None = None) -> np.ndarray:
+        """
+        Compute the exact outcome probabilities of measuring a few qubits.
+
+        Returns:
+            np.ndarray: 2^k probabilities, indexed by the bits of `qubits` in the given order.
+        """
+        return np.diagonal(self.reduced_density_matrix(qubits, max_size)).real.copy()
@@ -0,0 +1,209 @@
+import numpy as np
+
+from . import exceptions
+from . import gates
+from . import ir
+from . import kernels
+from . import quantum
+from . import states
+
+PAULIS = (
+    gates.GATES["cpu"]["PAULI_X"],
+    gates.GATES["cpu"]["PAULI_Y"],
+    gates.GATES["cpu"]["PAULI_Z"],
+)
+
+def amplitude_damping(gamma: float) -> list[np.ndarray]:
+    return [np.array([[1, 0], [0, np.sqrt(1 - gamma)]], dtype=complex),
+            np.array([[0, np.sqrt(gamma)], [0, 0]], dtype=complex)]
+
+def phase_damping(gamma: float) -> list[np.ndarray]:
+    return [np.array([[1, 0], [0, np.sqrt(1 - gamma)]], dtype=complex),
+            np.array([[0, 0], [0, np.sqrt(gamma)]], dtype=complex)]
+
+
+class Trajectories:
+    """
+    Monte Carlo quantum-trajectory simulator for noisy circuits.
+
+    A batch of pure states is stored as the columns of one (2^n, T) array and
+    every gate is applied to all columns at once. Noise is unravelled into
+    stochastic Pauli or Kraus jumps drawn independently per trajectory, so
+    averages over the batch converge to the density-matrix result at T times
+    the memory of a single state vector rather than 4^n.
+
+    Args:
+        state (str): The initial basis state of every trajectory.
+        trajectories (int): The number of trajectories T.
+        device (str): The device; only "cpu" is supported.
+        depolarizing (float): Probability of a uniformly random Pauli error on
+            each qubit a gate acts on, applied after every gate.
+        seed: Seed for the trajectory RNG.
+    """
+
+    def __init__(self, state: str = "0", trajectories: int = 100, device: str = "cpu", depolarizing: float = 0.0, seed: int | None = None) -> None:
+        if device != "cpu":
+            raise exceptions.DeviceError(device)
+        self.device = device
+        self.module = np
+        self.qubits = len(state)
+        self.space = 2 ** self.qubits
+        self.trajectories = trajectories
+        self.depolarizing = depolarizing
+        self.rng = np.random.default_rng(seed)
+
+        self.__states = np.zeros((self.space, trajectories), dtype=complex)
+        self.__states[states.basis_index(state), :] = 1
+
+    def get_states(self) -> np.ndarray:
+        return self.__states
+
+    def __check_qubits(self, *qubits: int) -> None:
+        for qubit in qubits:
+            if qubit < 0 or qubit >= self.qubits:
+                raise exceptions.StateError(str(qubit))
+        if len(set(qubits)) != len(qubits):
+            raise exceptions.StateError(str(qubits))
+
+    def gate(self, gate: np.ndarray, *qubits: int) -> None:
+        self.__check_qubits(*qubits)
+        self.__states = kernels.apply(self.__states, gate, qubits)
+        if self.depolarizing:
+            for qubit in qubits:
+                self.depolarize(qubit, self.depolarizing)
+
+    def hadamard(self, qubit: int) -> None:
+        self.gate(gates.GATES[self.device]["HADAMARD"], qubit)
+
+    def pauli_x(self, qubit: int) -> None:
+        self.gate(gates.GATES[self.device]["PAULI_X"], qubit)
+
+    def pauli_y(self, qubit: int) -> None:
+        self.gate(gates.GATES[self.device]["PAULI_Y"], qubit)
+
+    def pauli_z(self, qubit: int) -> None:
+        self.gate(gates.GATES[self.device]["PAULI_Z"], qubit)
+
+    def rx(self, qubit: int, theta: float) -> None:
+        self.gate(gates.rx(theta), qubit)
+
+    def ry(self, qubit: int, theta: float) -> None:
+        self.gate(gates.ry(theta), qubit)
+
+    def rz(self, qubit: int, theta: float) -> None:
+        self.gate(gates.rz(theta), qubit)
+
+    def cnot(self, control: int, target: int) -> None:
+        self.gate(gates.GATES[self.device]["CNOT"], control, target)
+
+    def cy(self, control: int, target: int) -> None:
+        self.gate(gates.GATES[self.device]["CY"], control, target)
+
+    def cz(self, control: int, target: int) -> None:
+        self.gate(gates.GATES[self.device]["CZ"], control, target)
+
+    def swap(self, qubit1: int, qubit2: int) -> None:
+        self.gate(gates.GATES[self.device]["SWAP"], qubit1, qubit2)
+
+    def toffoli(self, control1: int, control2: int, target: int) -> None:
+        self.gate(gates.GATES[self.device]["TOFFOLI"], control1, control2, target)
+
+    def cswap(self, control: int, target1: int, target2: int) -> None:
+        self.gate(gates.GATES[self.device]["CSWAP"], control, target1, target2)
+
+    def run(self, circuit: quantum.Circuit) -> None:
+        if circuit.qubits != self.qubits:
+            raise exceptions.StateError(str(circuit.qubits))
+        for opcode, qubits, param in circuit.instructions:
+            if opcode == ir.MEASURE:
+                self.measure([qubits[0]])
+            else:
+                self.gate(ir.matrix(opcode, param, self.device), *qubits)
+
+    def pauli_channel(self, qubit: int, px: float, py: float, pz: float) -> None:
+        """
+        Apply X, Y or Z to each trajectory independently with the given probabilities.
+        """
+        self.__check_qubits(qubit)
+        choice = self.rng.choice(4, size=self.trajectories, p=[1 - px - py - pz, px, py, pz])
+        for pauli, matrix in enumerate(PAULIS, 1):
+            selected = choice == pauli
+            if selected.any():
+                self.__states[:, selected] = kernels.apply(self.__states[:, selected], matrix, (qubit,))
+
+    def depolarize(self, qubit: int, p: float) -> None:
+        self.pauli_channel(qubit, p / 3, p / 3, p / 3)
+
+    def kraus(self, operators: list[np.ndarray], *qubits: int) -> None:
+        """
+        Apply a channel given by Kraus operators, choosing one operator per trajectory
+        with probability ‖K ψ‖² and renormalising the chosen branch.
+
+        Args:
+            operators: Kraus operators (2^k, 2^k) with Σ K†K = I.
+            *qubits: The k qubits the channel acts on.
+        """
+        self.__check_qubits(*qubits)
+        draws = self.rng.random(self.trajectories)
+        cumulative = np.zeros(self.trajectories)
+        output = np.empty_like(self.__states)
+        last = np.zeros(self.trajectories, dtype=np.intp)
+        for index, operator in enumerate(operators):
+            branch = kernels.apply(self.__states, operator, qubits)
+            weights = np.einsum("ij,ij->j", branch.conj(), branch).real
+            selected = (draws >= cumulative) & (draws < cumulative + weights)
+            output[:, selected] = branch[:, selected] / np.sqrt(weights[selected])
+            cumulative += weights
+            last[weights > 0] = index
+        # Rounding can leave a draw just above the total weight; keep the last
+        # branch with a non-zero weight there.
+        missed = draws >= cumulative
+        for index in np.unique(last[missed]):
+            columns = missed & (last == index)
+            branch = kernels.apply(self.__states[:, columns], operators[index], qubits)
+            output[:, columns] = branch / np.linalg.norm(branch, axis=0)
+        self.__states = output
+
+    def amplitude_damping(self, qubit: int, gamma: float) -> None:
+        self.kraus(amplitude_damping(gamma), qubit)
+
+    def phase_damping(self, qubit: int, gamma: float) -> None:
+        self.kraus(phase_damping(gamma), qubit)
+
+    def probabilities(self) -> np.ndarray:
+        return np.mean(np.abs(self.__states) ** 2, axis=1)
+
+    def sample(self, shots: int) -> dict[str, int]:
+        probabilities = self.probabilities()
+        histogram = self.rng.multinomial(shots, probabilities / probabilities.sum())
+        return {f"{index:0>{self.qubits}b}": int(histogram[index]) for index in np.flatnonzero(histogram)}
+
+    def measure(self, qubits: list[int] | None = None) -> list[str]:
+        """
+        Measure every trajectory and collapse it in place.
+
+        Returns:
+            list[str]: One outcome per trajectory, over `qubits` (all qubits by default).
+        """
+        qubits = list(range(self.qubits)) if qubits is None else list(qubits)
+        self.__check_qubits(*qubits)
+        tensor = self.__states.reshape((2,) * self.qubits + (self.trajectories,))
+        unmeasured = tuple(i for i in range(self.qubits) if i not in qubits)
+        probabilities = (np.abs(tensor) ** 2).sum(axis=unmeasured) if unmeasured else np.abs(tensor) ** 2
+        order = sorted(qubits)
+        probabilities = probabilities.transpose([order.index(qubit) for qubit in qubits] + [len(qubits)])
+        probabilities = probabilities.reshape(2 ** len(qubits), self.trajectories)
+
+        cumulative = np.cumsum(probabilities, axis=0)
+        draws = self.rng.random(self.trajectories) * cumulative[-1]
+        outcomes = np.minimum((cumulative < draws).sum(axis=0), 2 ** len(qubits) - 1)
+
+        columns = np.arange(self.trajectories)
+        for position, qubit in enumerate(qubits):
+            bits = (outcomes >> (len(qubits) - 1 - position)) & 1
+            for bit in (0, 1):
+                mask = [slice(None)] * self.qubits
+                mask[qubit] = 1 - bit
+                tensor[tuple(mask) + (columns[bits == bit],)] = 0
+        self.__states /= np.sqrt(probabilities[outcomes, columns])
+        return [f"{outcome:0>{len(qubits)}b}" for outcome in outcomes]
@@ -0,0 +1,22 @@
+import numpy as np
+
+from qcircpy import backends
+from qcircpy import engine
+from qcircpy import quantum
+
+
+def test_registered_backend_runs_gates():
+    backends.register("test-cpu", backends.Backend)
+    try:
+        runtime = engine.Runtime("00", "test-cpu")
+        runtime.hadamard(0)
+        runtime.cnot(0, 1)
+        circuit = quantum.Circuit(2, "test-cpu")
+        circuit.hadamard(0)
+        circuit.append("CNOT", (0, 1))
+
+        expected = np.array([1, 0, 0, 1]) / np.sqrt(2)
+        assert np.allclose(runtime.get_state(flat=True), expected)
+        assert np.allclose(circuit("00").ravel(), expected)
+    finally:
+        backends.BACKENDS.pop("test-cpu")
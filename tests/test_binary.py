@@ -0,0 +1,34 @@
+import pytest
+
+from qcircpy import binary
+from qcircpy import exceptions
+from qcircpy import quantum
+
+
+def test_long_device_name_is_rejected():
+    circuit = quantum.Circuit(1)
+    circuit.device = "cpu-" + "x" * 20
+
+    with pytest.raises(ValueError):
+        binary.dumps(circuit)
+
+
+def test_instruction_qubit_outside_register_is_rejected():
+    circuit = quantum.Circuit(2)
+    circuit.append("CNOT", (0, 1))
+    data = binary.dumps(circuit)
+    # Shrink the register in the header: magic (4), version (2), sections (2), qubits.
+    data = data[:8] + (1).to_bytes(4, "little") + data[12:]
+
+    with pytest.raises(exceptions.FormatError):
+        binary.loads(data)
+
+
+@pytest.mark.parametrize("qubits", [(-2, -1, -1), (-1, -1, -1), (0, 1, -1)])
+def test_invalid_instruction_qubits_are_rejected(qubits):
+    circuit = quantum.Circuit(2)
+    circuit.hadamard(0)
+    circuit.instructions.array["qubits"][0] = qubits
+
+    with pytest.raises(exceptions.FormatError):
+        binary.loads(binary.dumps(circuit))
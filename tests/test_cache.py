@@ -0,0 +1,15 @@
+from qcircpy import cache
+from qcircpy import quantum
+
+
+def test_prefix_with_measurement_is_not_cached():
+    prefix = quantum.Circuit(1)
+    prefix.hadamard(0)
+    prefix.append("MEASURE", (0,))
+    prefixes = cache.PrefixCache()
+
+    outcomes = {prefixes.runtime(prefix).measure() for _ in range(64)}
+
+    assert outcomes == {"0", "1"}
+    assert len(prefixes) == 0
+    assert prefixes.hits == 0
@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+
+from qcircpy import circuits
+from qcircpy import gates
+
+
+def test_component_is_abstract():
+    with pytest.raises(TypeError):
+        circuits.Component()
+
+
+def test_wire_applies_gates_in_order():
+    first, second, third = (gates.GATES["cpu"][name] for name in ("HADAMARD", "PAULI_X", "PAULI_Y"))
+    wire = circuits.Wire("cpu", first, second, third)
+
+    assert np.allclose(wire.matrix, third @ second @ first)
@@ -0,0 +1,34 @@
+import numpy as np
+
+from qcircpy import engine
+from qcircpy import gates
+
+
+def test_adopted_buffer_is_not_modified():
+    amplitudes = np.zeros(4, dtype=complex)
+    amplitudes[2] = 1
+    runtime = engine.Runtime.from_amplitudes(amplitudes)
+    runtime.cnot(0, 1)
+    runtime.pauli_x(1)
+    runtime.mcgate(gates.GATES["cpu"]["PAULI_X"], 1, (0,))
+    runtime.measure()
+
+    assert np.array_equal(amplitudes, [0, 0, 1, 0])
+    assert np.allclose(runtime.get_state(flat=True), [0, 0, 0, 1])
+
+
+def test_mcgate_accepts_numpy_integers():
+    runtime = engine.Runtime("110")
+    runtime.mcgate(gates.GATES["cpu"]["PAULI_X"], np.int64(2), (np.int64(0), np.int64(1)), "11")
+
+    assert runtime.measure() == "111"
+
+
+def test_measuring_no_qubits_returns_an_empty_outcome():
+    runtime = engine.Runtime("10")
+    runtime.hadamard(1)
+    before = runtime.get_state(copy=True)
+
+    assert runtime.measure([]) == ""
+    assert runtime.measure_no_reset([]) == ""
+    assert np.array_equal(runtime.get_state(), before)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from qcircpy import ir
+from qcircpy import optimiser
+from qcircpy import quantum
+
+
+def test_optimise_passes_window_to_every_pass():
+    circuit = quantum.Circuit(2)
+    circuit.hadamard(0)
+    circuit.append("CZ", (0, 1))
+    circuit.hadamard(0)
+    circuit.pauli_x(1)
+    circuit.pauli_x(1)
+
+    assert optimiser.optimise(circuit, window=4) == {"cancel_inverses": 2, "cancel_commuting": 0, "merge_rotations": 0}
+    assert len(circuit.instructions) == 3
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_optimise_preserves_the_unitary(seed):
+    rng = np.random.default_rng(seed)
+    circuit = quantum.Circuit(3)
+    names = [name for name in ir.OPCODES if name != "MEASURE"]
+    for _ in range(40):
+        name = names[rng.integers(len(names))]
+        qubits = tuple(int(qubit) for qubit in rng.permutation(3)[:ir.ARITY[ir.OPCODE[name]]])
+        # Few distinct angles, so merged rotations also cancel to multiples of 4π.
+        param = float(rng.choice([np.pi, 2 * np.pi, -np.pi, 0.3])) if name in ("RX", "RY", "RZ") else 0.0
+        circuit.append(name, qubits, param)
+    before = circuit.compile()
+
+    removed = optimiser.optimise(circuit)
+
+    assert np.allclose(circuit.compile(), before)
+    assert len(circuit.instructions) == 40 - sum(removed.values())
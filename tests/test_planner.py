@@ -0,0 +1,21 @@
+from qcircpy import generators
+from qcircpy import planner
+from qcircpy import tensornet
+
+
+def test_estimates_include_calibrated_overheads():
+    circuit = generators.random_layered(8, 4, seed=0)
+    calibration = {"bandwidth": 1e30, "flops": 1e30, "gate": 1e-3, "step": 1.0}
+
+    estimates = planner.estimate(circuit, [0], calibration)
+
+    steps = len(tensornet.TensorNetwork(circuit).plan(qubits=[0]).path)
+    assert abs(estimates["tensornet"].seconds - steps) < 1e-9
+    assert abs(estimates["kernel"].seconds - len(circuit.instructions) * 1e-3) < 1e-9
+
+
+def test_calibration_has_overheads():
+    calibration = planner.calibrate()
+
+    assert set(calibration) == {"bandwidth", "flops", "gate", "step"}
+    assert all(value > 0 for value in calibration.values())
@@ -0,0 +1,23 @@
+import pytest
+
+from qcircpy import exceptions
+from qcircpy import ir
+from qcircpy import qasm
+
+
+def test_statement_split_across_lines():
+    circuit = qasm.loads("qreg q[2];\nh\nq[0];\ncx q[0],\nq[1]; rz(\npi) q[1\n];")
+
+    assert circuit.instructions.array["opcode"].tolist() == [ir.OPCODE["HADAMARD"], ir.OPCODE["CNOT"], ir.OPCODE["RZ"]]
+
+
+@pytest.mark.parametrize("angle", ["nan", "inf", "-inf", "1e308 * 10"])
+def test_non_finite_angle_is_rejected(angle):
+    with pytest.raises(exceptions.ParseError):
+        qasm.loads(f"qreg q[1];\nrx({angle}) q[0];")
+
+
+@pytest.mark.parametrize("angle", ["exp(1000)", "1/0", "sqrt(-1)", "ln(0)", "9**9**9", "(-1)**0.5", "1" * 400])
+def test_invalid_arithmetic_is_rejected(angle):
+    with pytest.raises(exceptions.ParseError):
+        qasm.loads(f"qreg q[1];\nrx({angle}) q[0];")
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from qcircpy import quantum
+
+
+def test_qram_compact_after_reusing_a_freed_block():
+    a = np.full((4, 1), 1, dtype=complex)
+    b = np.full((4, 1), 2, dtype=complex)
+    c = np.full((2, 1), 3, dtype=complex)
+    d = np.full((4, 1), 4, dtype=complex)
+
+    qram = quantum.QRAM("cpu")
+    first, second, third = qram.store(a, b, c)
+    qram.delete(first)
+    fourth, = qram.store(d)
+    qram.compact()
+
+    assert np.array_equal(qram.fetch(second), b)
+    assert np.array_equal(qram.fetch(third), c)
+    assert np.array_equal(qram.fetch(fourth), d)
+
+
+def test_evolve_and_apply_operator_agree():
+    circuit = quantum.Circuit(2)
+    circuit.hadamard(0)
+    circuit.append("CNOT", (0, 1))
+    vectors = np.identity(4, dtype=complex)[:, :2]
+
+    assert np.allclose(circuit.evolve(vectors=vectors), circuit.apply_operator(vectors=vectors, operator=circuit.compile()))
+
+
+def test_gates_cannot_be_appended_to():
+    circuit = quantum.Circuit(1)
+    circuit.hadamard(0)
+
+    assert len(circuit.gates) == 1
+    with pytest.raises(AttributeError):
+        circuit.gates.append(np.identity(2))
+
+
+def test_compile_chunks_agree():
+    circuit = quantum.Circuit(3)
+    circuit.hadamard(0)
+    circuit.append("TOFFOLI", (0, 1, 2))
+    circuit.append("RY", (1,), 0.4)
+
+    whole = circuit.compile()
+
+    assert np.allclose(circuit.compile(chunk=3, workers=2), whole)
+    assert np.allclose(circuit.compile(sparse=True).to_dense(), whole)
+    assert np.allclose(whole.conj().T @ whole, np.identity(8))
@@ -0,0 +1,14 @@
+import numpy as np
+
+from qcircpy import trajectories
+
+
+def test_kraus_falls_back_to_a_branch_with_weight():
+    # The weights sum to less than one and the last operator has weight zero
+    # on |0>, so draws past the total must land on the first branch.
+    runtime = trajectories.Trajectories("0", trajectories=256, seed=0)
+    runtime.kraus([np.sqrt(0.5) * np.diag([1, 0]), np.array([[0, 1], [0, 0]])], 0)
+
+    states = runtime.get_states()
+    assert np.isfinite(states).all()
+    assert np.allclose(states[0], 1)